@@ -0,0 +1,47 @@
+"""
+Разбор корпуса без кэша, с пустым кэшем и повторно -- из памяти процесса
+и из базы SQLite (новый объект кэша, как в другом процессе пула).
+
+Запуск:
+    python benchmarks/bench_cache.py
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import load_module, throughput
+from corpus import corpus
+
+from fips_open_register_documents_parser.cache import ParseCache
+
+
+def timed(cache, documents):
+    started = time.perf_counter()
+    for kind, html in documents:
+        cache.parse(html, kind)
+    return len(documents) / (time.perf_counter() - started)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--size", type=int, default=500, help="число документов в корпусе")
+    args = argparser.parse_args()
+
+    documents = corpus(args.size, seed=42)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.db")
+        cache = ParseCache(maxsize=args.size, path=path)
+        results = [
+            ("no cache", throughput(load_module(), documents, repeat=1)),
+            ("cold", timed(cache, documents)),
+            ("memory", timed(cache, documents)),
+            ("sqlite", timed(ParseCache(maxsize=args.size, path=path), documents)),
+        ]
+    for name, value in results:
+        print("%-10s %10.1f docs/s" % (name + ":", value))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Сравнение движков извлечения parse(engine='full') и parse(engine='anchors')
+на крупных страницах патентов с длинными разделами извещений.
+
+Запуск:
+    python benchmarks/bench_engine.py
+"""
+
+import argparse
+
+from common import load_module, throughput
+from corpus import design_page, evm_page, patent_page
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--notices", type=int, default=800, help="число извещений на странице патента")
+    argparser.add_argument("--size", type=int, default=20, help="число документов каждого вида")
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    module = load_module()
+    corpora = {
+        "patent": [("patent", patent_page(seed, notices=args.notices)) for seed in range(args.size)],
+        "design": [("design", design_page(seed, notices=args.notices // 4)) for seed in range(args.size)],
+        "patent-no-izv": [("patent", patent_page(seed, notices=0)) for seed in range(args.size)],
+        "evm": [("evm", evm_page(seed)) for seed in range(args.size * 10)],
+    }
+    # сохранённые с сайта страницы содержат отступы, и после нормализации html_data
+    # документ превращается в несколько очень длинных строк
+    corpora["patent-1line"] = [(kind, html.replace("\n", "\n  ")) for kind, html in corpora["patent"]]
+    corpora["evm-1line"] = [(kind, html.replace("\n", "\n  ")) for kind, html in corpora["evm"]]
+    # страница без большинства якорей: шаблоны в режиме 'full' просматривают её целиком
+    filler = "<p>(24) Дата <b>сведения</b> (72) (73) <p>текст страницы</p>\n  " * 4000
+    corpora["no-anchors"] = [(kind, filler) for kind in ("patent", "design", "evm") * args.size]
+    for name, documents in corpora.items():
+        kb = sum(len(html) for _, html in documents) / len(documents) / 1024
+        best = {"full": 0.0, "anchors": 0.0}
+        for _ in range(args.repeat):
+            for engine in best:
+                best[engine] = max(best[engine], throughput(module, documents, repeat=1, engine=engine))
+        print("%-14s %7.1f KB  full: %8.1f docs/s  anchors: %8.1f docs/s  (%.2fx)"
+              % (name, kb, best["full"], best["anchors"], best["anchors"] / best["full"]))
+
+
+if __name__ == "__main__":
+    main()
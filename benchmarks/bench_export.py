@@ -0,0 +1,50 @@
+"""
+Скорость выгрузки результатов разбора (ExportSink) и пиковая память (tracemalloc,
+отдельный прогон) при разном числе документов: пик не должен зависеть от объёма выгрузки.
+
+Результаты разбора небольшого корпуса повторяются до нужного числа документов.
+
+Запуск:
+    python benchmarks/bench_export.py --format parquet
+"""
+
+import argparse
+import itertools
+import tempfile
+import time
+import tracemalloc
+
+import common  # noqa: F401 -- добавляет корень репозитория в sys.path
+from corpus import corpus
+
+from fips_open_register_documents_parser.batch import ParseResult, parse_many
+from fips_open_register_documents_parser.export import ExportSink
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--format", default=None)
+    argparser.add_argument("--row-group-size", type=int, default=5000)
+    args = argparser.parse_args()
+
+    parsed = list(parse_many(corpus(500, seed=3), processes=0))
+    for count in (10000, 40000, 80000):
+        measured = {}
+        for traced in (False, True):
+            results = (ParseResult(index, None, result.doc_type, result.parsed)
+                       for index, result in zip(range(count), itertools.cycle(parsed)))
+            with tempfile.TemporaryDirectory() as directory:
+                if traced:
+                    tracemalloc.start()
+                started = time.perf_counter()
+                with ExportSink(directory, args.format, args.row_group_size) as sink:
+                    sink.write_all(results)
+                measured[traced] = time.perf_counter() - started
+                if traced:
+                    measured['peak'] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+        print("%-8s %6d docs: %8.0f docs/s, peak %6.1f MB" % (sink.format, count, count / measured[False],
+                                                              measured['peak'] / 2 ** 20))
+
+if __name__ == "__main__":
+    main()
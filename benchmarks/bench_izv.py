@@ -0,0 +1,91 @@
+"""
+Разбор извещений патента с большим числом извещений.
+
+По умолчанию сравниваются полный разбор (find_izv) и разбор только новых
+извещений (new_izv) -- после отметки на последних --new извещениях.
+
+С --scaling выводится время find_izv и отдельно извлечения сведений из отобранных
+извещений (extract_izv) на страницах с разным числом извещений, в мкс на извещение;
+с --baseline -- также для указанной ревизии git.
+
+Запуск:
+    python benchmarks/bench_izv.py --notices 1000 --new 10
+    python benchmarks/bench_izv.py --scaling --baseline HEAD~1
+"""
+
+import argparse
+import time
+
+from common import load_module
+from corpus import patent_page
+
+
+def best_time(function, repeat, setup=None):
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def loaded_parser(module, notices):
+    parser = module.FIPSDocPatentParser()
+    parser.html_data = patent_page(0, notices=notices, chronological=True)
+    parser.html_data_min
+    parser.parse(fields=["izv"])
+    return parser
+
+
+def incremental(args):
+    module = load_module()
+    parser = loaded_parser(module, args.notices)
+    notices = parser.parsed["izv"]
+    watermark = sorted(notices, key=lambda izv: izv["pub_date"].split(".")[::-1])[-args.new - 1]
+    signature = module.izv_signature(watermark)
+
+    full = best_time(parser.find_izv, args.repeat)
+    new = best_time(lambda: parser.new_izv(signature=signature), args.repeat)
+    print("notices: %d (selected %d), new: %d" % (args.notices, len(notices), len(parser.new_izv(signature=signature))))
+    print("%-10s %8.2f ms" % ("find_izv:", full * 1000))
+    print("%-10s %8.2f ms" % ("new_izv:", new * 1000))
+
+
+def scaling(args):
+    modules = {"current": load_module()}
+    if args.baseline:
+        modules[args.baseline] = load_module(args.baseline)
+    print("%-10s %8s %9s %14s %14s" % ("revision", "notices", "selected", "find_izv us/n", "extract us/n"))
+    for count in (125, 250, 500, 1000, 2000):
+        for name, module in modules.items():
+            parser = loaded_parser(module, count)
+            selected = [dict(izv) for izv in parser.parsed["izv"]]
+
+            def reset():
+                parser.parsed["izv"] = [dict(izv) for izv in selected]
+
+            find = best_time(parser.find_izv, args.repeat)
+            extract = best_time(parser.extract_izv, args.repeat, reset)
+            print("%-10s %8d %9d %14.2f %14.2f" % (name, count, len(selected), find / count * 1e6,
+                                                   extract / max(len(selected), 1) * 1e6))
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--notices", type=int, default=1000)
+    argparser.add_argument("--new", type=int, default=10, help="число извещений после отметки")
+    argparser.add_argument("--repeat", type=int, default=20)
+    argparser.add_argument("--scaling", action="store_true", help="зависимость от числа извещений")
+    argparser.add_argument("--baseline", help="ревизия git для сравнения (с --scaling)")
+    args = argparser.parse_args()
+    if args.scaling:
+        scaling(args)
+    else:
+        incremental(args)
+
+
+if __name__ == "__main__":
+    main()
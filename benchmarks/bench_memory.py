@@ -0,0 +1,91 @@
+"""
+Пиковое потребление памяти при разборе крупной страницы патента (1 МБ и более)
+с большим числом извещений.
+
+Каждый замер выполняется в отдельном процессе: пиковый RSS -- без tracemalloc
+(он сам увеличивает RSS), пик tracemalloc -- в отдельном запуске. Прирост RSS
+отсчитывается от пикового RSS процесса, который только загружает модуль парсера
+(см. peak_rss).
+
+Запуск:
+    python benchmarks/bench_memory.py --baseline HEAD~1
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from common import load_module
+from corpus import patent_page
+
+
+def child(mode, revision, path, encoding):
+    module = load_module(revision if revision != "current" else None)
+    if mode == "traced":
+        tracemalloc.start()
+    if mode != "idle":
+        parser = module.FIPSDocPatentParser()
+        if hasattr(parser, "feed_file"):
+            parser.feed_file(path)
+        else:
+            with open(path, encoding=encoding) as f:
+                parser.html_data = f.read()
+        parser.parse()
+    if mode == "traced":
+        print(tracemalloc.get_traced_memory()[1])
+    else:
+        print(peak_rss())
+
+
+def peak_rss():
+    """
+    Пиковый RSS процесса в байтах. В Linux -- VmHWM: ru_maxrss сохраняется при exec
+    и включает пик родительского процесса, который держит в памяти созданную страницу.
+    """
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--baseline", help="ревизия git для сравнения")
+    argparser.add_argument("--notices", type=int, default=4000)
+    argparser.add_argument("--encoding", default="windows-1251")
+    argparser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.child:
+        child(*args.child, encoding=args.encoding)
+        return
+
+    html = patent_page(0, notices=args.notices).replace("\n", "\n  ")
+    with tempfile.NamedTemporaryFile("wb", suffix=".html", delete=False) as f:
+        f.write(html.encode(args.encoding))
+    try:
+        print("page: %.1f MB (%s)" % (os.path.getsize(f.name) / 2 ** 20, args.encoding))
+        for revision in ["current"] + ([args.baseline] if args.baseline else []):
+            measured = {}
+            for mode in ("idle", "rss", "traced"):
+                measured[mode] = int(subprocess.run(
+                    [sys.executable, __file__, "--encoding", args.encoding, "--child", mode, revision, f.name],
+                    check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout)
+            print("%-10s peak RSS %6.1f MB (+%5.1f MB), tracemalloc peak %6.1f MB" % (
+                revision + ":", measured["rss"] / 2 ** 20, (measured["rss"] - measured["idle"]) / 2 ** 20,
+                measured["traced"] / 2 ** 20))
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
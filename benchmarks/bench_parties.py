@@ -0,0 +1,56 @@
+"""
+Память, занимаемая результатами разбора партии документов: исходные фрагменты
+HTML со списками правообладателей и авторов, записи Party без объединения
+и записи, объединённые словарём PartyDictionary (как в parse_many(structured=True)).
+
+Запуск:
+    python benchmarks/bench_parties.py --size 5000
+"""
+
+import argparse
+import copy
+import gc
+import time
+import tracemalloc
+
+import common  # noqa: F401 -- добавляет корень репозитория в sys.path
+from corpus import corpus
+
+from fips_open_register_documents_parser.batch import parse_many
+from fips_open_register_documents_parser.FIPSDocParser import PartyDictionary, structure_parsed
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return results, size, elapsed
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--size", type=int, default=5000, help="число документов")
+    args = argparser.parse_args()
+
+    documents = corpus(args.size, seed=7, kinds=("patent", "design", "evm", "db"))
+    parsed = [result.parsed for result in parse_many(documents, processes=0)]
+    parties = PartyDictionary()
+    variants = [
+        ("raw", lambda: copy.deepcopy(parsed)),
+        ("structured", lambda: [structure_parsed(item) for item in copy.deepcopy(parsed)]),
+        ("interned", lambda: [structure_parsed(item, parties) for item in copy.deepcopy(parsed)]),
+    ]
+    for name, build in variants:
+        results, size, elapsed = retained(build)
+        print("%-11s %8.1f MB %8.3f s" % (name + ":", size / 2 ** 20, elapsed))
+        del results
+    print("distinct parties: %d" % len(parties))
+
+
+if __name__ == "__main__":
+    main()
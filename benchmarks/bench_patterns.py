@@ -0,0 +1,39 @@
+"""
+Пропускная способность parse() на корпусе патентов и свидетельств ПрЭВМ.
+
+Запуск:
+    python benchmarks/bench_patterns.py --baseline HEAD~1
+
+Без --baseline замеряется только рабочее дерево.
+"""
+
+import argparse
+
+from common import load_module, throughput
+from corpus import corpus
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--baseline", help="ревизия git для сравнения")
+    argparser.add_argument("--size", type=int, default=500, help="число документов в корпусе")
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    documents = corpus(args.size, seed=42, kinds=("patent", "evm"))
+    modules = {"current": load_module()}
+    if args.baseline:
+        modules[args.baseline] = load_module(args.baseline)
+    # замеры чередуются, чтобы фоновая нагрузка одинаково влияла на обе версии
+    best = dict.fromkeys(modules, 0.0)
+    for _ in range(args.repeat):
+        for name, module in modules.items():
+            best[name] = max(best[name], throughput(module, documents, repeat=1))
+    for name, value in best.items():
+        print("%-10s %8.1f docs/s" % (name + ":", value))
+    if args.baseline:
+        print("%-10s %8.2fx" % ("speedup:", best["current"] / best[args.baseline]))
+
+
+if __name__ == "__main__":
+    main()
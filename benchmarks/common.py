@@ -0,0 +1,67 @@
+"""
+Общие функции бенчмарков: загрузка парсеров текущего дерева или
+произвольной ревизии git и замер пропускной способности.
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE_PATH = "fips_open_register_documents_parser/FIPSDocParser.py"
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_module(revision=None):
+    """
+    Загружает модуль FIPSDocParser из рабочего дерева (revision=None)
+    или из указанной ревизии git (например, "HEAD~1").
+    """
+
+    if revision is None:
+        from fips_open_register_documents_parser import FIPSDocParser
+        return FIPSDocParser
+    source = subprocess.run(["git", "show", "%s:%s" % (revision, MODULE_PATH)], cwd=ROOT, check=True,
+                            stdout=subprocess.PIPE).stdout
+    with tempfile.NamedTemporaryFile("wb", suffix=".py", delete=False) as f:
+        f.write(source)
+    try:
+        spec = importlib.util.spec_from_file_location("FIPSDocParser_%s" % revision.replace("~", "_"), f.name)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        os.unlink(f.name)
+    return module
+
+
+def parser_classes(module):
+    """Соответствие вида документа классу парсера модуля."""
+
+    return {
+        "patent": module.FIPSDocPatentParser,
+        "design": module.FIPSDocPatentDesignParser,
+        "evm": module.FIPSDocEVMParser,
+        "db": module.FIPSDocDBParser,
+        "tims": module.FIPSDocTIMSParser,
+    }
+
+
+def throughput(module, documents, repeat=3, **parse_kwargs):
+    """Лучшая из repeat попыток пропускная способность parse(), документов в секунду."""
+
+    classes = parser_classes(module)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for kind, html in documents:
+            parser = classes[kind]()
+            parser.html_data = html
+            parser.parse(**parse_kwargs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(documents) / best
@@ -0,0 +1,320 @@
+"""
+Генератор синтетических страниц Открытых реестров ФИПС для бенчмарков.
+
+Страницы повторяют разметку, на которую рассчитаны шаблоны парсеров
+(библиографические поля, статус, извещения), и детерминированы по seed.
+"""
+
+import datetime
+import random
+
+NAMES = [
+    "Иванов Иван Иванович", "Петров Пётр Петрович", "Сидорова Анна Сергеевна",
+    "Кузнецов Алексей Викторович", "Смирнова Ольга Николаевна", "Попов Дмитрий Андреевич",
+    "Васильев Кирилл Борисович", "Соколова Мария Олеговна", "Михайлов Денис Сергеевич",
+]
+
+ORGS = [
+    "Общество с ограниченной ответственностью \"Ромашка\"",
+    "Акционерное общество \"Научно-производственное объединение \"Вектор\"\"",
+    "Федеральное государственное бюджетное образовательное учреждение высшего образования "
+    "\"Московский государственный технический университет\"",
+    "Публичное акционерное общество \"Газпром нефть\"",
+    "SIEMENS AKTIENGESELLSCHAFT",
+]
+
+COUNTRIES = ["RU", "RU", "RU", "BY", "KZ", "DE"]
+
+TITLES = [
+    "СПОСОБ ПОЛУЧЕНИЯ КОМПОЗИЦИОННОГО МАТЕРИАЛА",
+    "УСТРОЙСТВО ДЛЯ ОЧИСТКИ СТОЧНЫХ ВОД",
+    "ВОЗБУДИТЕЛЬ ВОЛНЫ ТЕ<sub>01</sub>",
+    "СИСТЕМА УПРАВЛЕНИЯ РОБОТИЗИРОВАННЫМ КОМПЛЕКСОМ",
+]
+
+STATUSES = [
+    "действует",
+    "прекратил действие, но может быть восстановлен",
+    "может прекратить свое действие",
+]
+
+PATENT_IZV_CODES = ["PC4A", "PD4A", "TK4A", "TC4A", "MM4A", "NF4A", "PD9K", "PC1K", "QB4A"]
+DESIGN_IZV_CODES = ["PC4L", "PD4L", "PC4A", "PD4A", "TK4A", "TC4A", "MM4L", "NF4L"]
+
+
+def _date(rng, year_from=2000, year_to=2023):
+    return "%02d.%02d.%04d" % (rng.randint(1, 28), rng.randint(1, 12), rng.randint(year_from, year_to))
+
+
+def _persons(rng, count=None):
+    count = count or rng.randint(1, 4)
+    return ",<br>".join("%s (%s)" % (rng.choice(NAMES), rng.choice(COUNTRIES)) for _ in range(count))
+
+
+def _orgs(rng, count=None):
+    count = count or rng.randint(1, 2)
+    return ",<br>".join("%s (%s)" % (rng.choice(ORGS), rng.choice(COUNTRIES)) for _ in range(count))
+
+
+def _notice_dates(count):
+    # даты публикации извещений в порядке их следования на странице (по неделе на извещение)
+    start = datetime.date(2005, 1, 1)
+    return [(start + datetime.timedelta(weeks=i)).strftime("%d.%m.%Y") for i in range(count)]
+
+
+def _registry_link(db, number):
+    return ("<a title=\"Ссылка на реестр (открывается в отдельном окне)\" "
+            "href=\"https://new.fips.ru/registers-doc-view/fips_servlet?DB=%s&amp;DocNumber=%s&amp;TypeFile=html\" "
+            "target=\"_blank\">%s</a>" % (db, number, number))
+
+
+def _head(charset="utf-8"):
+    return ("<html>\n<head>\n"
+            "<meta http-equiv=\"Content-Type\" content=\"text/html; charset=%s\">\n"
+            "<title>Открытые реестры</title>\n"
+            "</head>\n<body>\n" % charset)
+
+
+def _status(rng):
+    return ("<table class=\"tp\"><tr><td id=\"StatusL\">Статус:</td>\n"
+            "<td id=\"StatusR\">%s\n"
+            "    (последнее изменение статуса: %s)<br>\n"
+            "    Пошлина: учтена за %d год</td></tr></table>\n"
+            % (rng.choice(STATUSES), _date(rng), rng.randint(2, 20)))
+
+
+def _pub_line(rng, date=None):
+    return ("<p class=\"izv\">Дата публикации: <b><a href=\"https://new.fips.ru/ofpstorage/Doc/IZPM/RUNWC1/000/000/"
+            "%d/document.pdf\" target=\"_blank\">%s</a></b></p>\n" % (rng.randint(1, 10 ** 6), date or _date(rng, 2005)))
+
+
+def _patent_izv(rng, code, date=None):
+    parts = ["<p class=\"NameIzv\">%s - Извещение об изменении сведений</p>\n" % code]
+    if code in ("PC4A", "PC9K", "PC1K", "PC4L"):
+        parts.append("<p class=\"izv\">(73) Новый патентообладатель(и):<br><b>%s</b></p>\n" % _orgs(rng))
+        parts.append("<p class=\"izv\">Дата и номер государственной регистрации перехода исключительного "
+                     "права: %s РП%07d</p>\n" % (_date(rng), rng.randint(1, 10 ** 6)))
+    elif code in ("PD4A", "PD9K", "PD1K", "PD4L"):
+        parts.append("<p class=\"izv\">(73) Новое наименование патентообладателя:<br><b>%s</b></p>\n"
+                     % _orgs(rng, 1))
+    elif code == "TK4A":
+        parts.append("<p class=\"izv\">Следует читать: </p>\n"
+                     "<p class=\"izv\">(73) Патентообладатель(и):<br><b>%s</b></p>\n"
+                     "<p class=\"izv\">(72) Автор(ы):<br><b>%s</b></p>\n" % (_orgs(rng, 1), _persons(rng)))
+    elif code == "TC4A":
+        parts.append("<p class=\"izv\">(72) Автор(ы):<br><b>%s</b></p>\n" % _persons(rng))
+    else:
+        parts.append("<p class=\"izv\">Дата прекращения действия патента: %s</p>\n" % _date(rng))
+    parts.append("<p class=\"izv\">Номер и год публикации бюллетеня: %d-%d</p>\n"
+                 % (rng.randint(1, 36), rng.randint(2000, 2023)))
+    parts.append(_pub_line(rng, date))
+    return "".join(parts)
+
+
+def patent_page(seed=0, notices=5, db="RUPAT", chronological=False):
+    """
+    Патент на изобретение (db="RUPAT") или полезную модель (db="RUPM").
+    chronological -- извещения опубликованы в порядке следования на странице, как на сайте ФИПС
+    (иначе даты публикации случайные).
+    """
+
+    rng = random.Random(seed)
+    number = rng.randint(2000000, 2800000)
+    app_number = rng.randint(2000100000, 2023199999)
+    app_date = _date(rng)
+    parts = [
+        _head(),
+        _status(rng),
+        "<div class=\"top\">%s</div>\n" % _registry_link(db, number),
+        "<table id=\"bib\"><tr><td>\n",
+        "<p>(21)(22) Заявка: <b><a href=\"https://new.fips.ru/registers-doc-view/fips_servlet?DB=RUPATAP&amp;"
+        "DocNumber=%d&amp;TypeFile=html\" target=\"_blank\">%d</a>, %s</b></p>\n" % (app_number, app_number, app_date),
+        "<p>(24) Дата начала отсчета срока действия патента: <br>\n<b>%s</b></p>\n" % app_date,
+        "<p class=\"prior\">Приоритет(ы):</p>\n",
+    ]
+    if rng.random() < 0.8:
+        parts.append("<p>(22) Дата подачи заявки: <b>%s</b></p>\n" % app_date)
+    else:
+        parts.append("<p>(30) Конвенционный приоритет:<br><b>%s DE 102019%06d</b></p>\n"
+                     % (_date(rng), rng.randint(0, 999999)))
+    parts += [
+        "<p>(45) Опубликовано: <b><a title=\"Официальная публикация в формате PDF\" "
+        "href=\"https://new.fips.ru/ofpstorage/Doc/IZPM/RUNWC1/000/002/%d/document.pdf\" target=\"_blank\">%s</a>"
+        "</b></p>\n" % (number, _date(rng)),
+        "</td><td>\n",
+        "<p>(72) Автор(ы):<b><br>%s</b></p>\n" % _persons(rng),
+        "<p>(73) Патентообладатель(и):<b><br>%s</b></p>\n" % _orgs(rng),
+        "</td></tr></table>\n",
+        "<p id=\"B542\">(54) <b>%s</b></p>\n" % rng.choice(TITLES),
+        "<div id=\"Abs\"><p>(57) Реферат:<br>%s</p></div>\n" % ("Изобретение относится к технике. " * 20),
+    ]
+    if rng.random() < 0.3:
+        parts.append("<p class=\"izv\">(72) Автор(ы):<br>\n<b>%s</b>\n</p>\n" % _persons(rng))
+    dates = _notice_dates(notices) if chronological else [None] * notices
+    for date in dates:
+        parts.append(_patent_izv(rng, rng.choice(PATENT_IZV_CODES), date))
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+
+def design_page(seed=0, notices=3, chronological=False):
+    """Патент на промышленный образец (chronological -- см. patent_page)."""
+
+    rng = random.Random(seed)
+    number = rng.randint(100000, 140000)
+    app_number = rng.randint(2018500000, 2023599999)
+    parts = [
+        _head(),
+        _status(rng),
+        "<div class=\"top\">%s</div>\n" % _registry_link("RUDE", number),
+        "<table id=\"bib\"><tr><td>\n",
+        "<p>(21) Номер заявки: <b><a href=\"https://new.fips.ru/registers-doc-view/fips_servlet?DB=RUDEAP&amp;"
+        "DocNumber=%d&amp;TypeFile=html\" target=\"_blank\">%d</a></b></p>\n" % (app_number, app_number),
+        "<p>(22) Дата подачи заявки: <b>%s</b></p>\n" % _date(rng),
+        "<p>(24) Дата начала отсчета срока действия патента: <b>%s</b></p>\n" % _date(rng),
+        "<p>(15) Дата регистрации: <b>%s</b></p>\n" % _date(rng),
+        "</td><td>\n",
+        "<p>(72) Автор(ы): <b><br>%s</b></p>\n" % _persons(rng),
+        "<p>(73) Патентообладатель(и): <b><br>%s,<br></b></p>\n" % _orgs(rng),
+        "</td></tr></table>\n",
+        "<p>(54) <b>%s</b></p>\n" % rng.choice(TITLES),
+    ]
+    dates = _notice_dates(notices) if chronological else [None] * notices
+    for date in dates:
+        parts.append(_patent_izv(rng, rng.choice(DESIGN_IZV_CODES), date))
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+
+def _evm_izv(rng):
+    kind = rng.choice(["holder", "author", "title"])
+    if kind == "holder":
+        head = "Новый правообладатель"
+        value = _orgs(rng, 1)
+    elif kind == "author":
+        head = "Изменения в сведения об авторах"
+        value = _persons(rng)
+    else:
+        head = "Изменено название программы для ЭВМ"
+        value = rng.choice(TITLES)
+    return ("<p class=\"NameIzv\">Извещение</p>\n"
+            "<p class=\"izv\">%s</p>\n"
+            "<p class=\"izv2\">Следует читать:</p>\n"
+            "<p class=\"izvValue\">%s</p>\n"
+            "<p class=\"izv\">Дата публикации: <b>%s</b></p>\n" % (head, value, _date(rng, 2010)))
+
+
+def _evm_db_page(rng, db, extra, notices):
+    number = rng.randint(2010610000, 2023699999)
+    parts = [
+        _head(),
+        "<div class=\"top\">%s</div>\n" % _registry_link(db, number),
+        "<table id=\"bib\"><tr><td>\n",
+        "<p>Номер и дата поступления заявки:<br>\n<b>%d %s</b></p>\n" % (rng.randint(2010610000, 2023699999),
+                                                                      _date(rng, 2010)),
+        "<p>Дата регистрации:<br>\n<b>%s</b></p>\n" % _date(rng, 2010),
+        "<p>Дата публикации: <b><a href=\"https://new.fips.ru/ofpstorage/Doc/PrEVM/RUNWPR/000/%d/document.pdf\" "
+        "target=\"_blank\">%s</a></b></p>\n" % (number, _date(rng, 2010)),
+        "</td><td>\n",
+        "<p>Авторы:<br>\n<b>%s</b></p>\n" % _persons(rng),
+        "<p>Правообладатель:<br>\n<b>%s</b></p>\n" % _orgs(rng, 1),
+        "</td></tr></table>\n",
+        "<p class=\"TitAbs\">Название программы для ЭВМ:<br>\n<b>%s</b></p>\n" % rng.choice(TITLES),
+        "<p class=\"TitAbs\"><b>Реферат:</b><br>%s</p>\n" % ("Программа предназначена для обработки данных. " * 10),
+        extra,
+    ]
+    for _ in range(notices):
+        parts.append(_evm_izv(rng))
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+
+def evm_page(seed=0, notices=2):
+    """Свидетельство о регистрации программы для ЭВМ."""
+
+    rng = random.Random(seed)
+    extra = ("<p><b>Язык программирования: </b>Python, C++</p>\n"
+             "<p><b>Объем программы для ЭВМ: </b>%d КБ</p>\n" % rng.randint(10, 100000))
+    return _evm_db_page(rng, "EVM", extra, notices)
+
+
+def db_page(seed=0, notices=2):
+    """Свидетельство о регистрации базы данных."""
+
+    rng = random.Random(seed)
+    extra = ("<p><b>Вид и версия системы управления базой данных: </b>PostgreSQL 13</p>\n"
+             "<p><b>Объем базы данных: </b>%d МБ</p>\n" % rng.randint(1, 10000))
+    return _evm_db_page(rng, "DB", extra, notices)
+
+
+def tims_page(seed=0, notices=1):
+    """Свидетельство о регистрации топологии интегральной микросхемы."""
+
+    return _evm_db_page(random.Random(seed), "TIMS", "", notices)
+
+
+def missing_page():
+    """Заглушка реестра для отсутствующего документа."""
+
+    return _head() + "<p>Документ с данным номером отсутствует</p>\n</body>\n</html>\n"
+
+
+# Худшие случаи
+
+_FILLER = "Описание относится к области техники и содержит сведения о способе и устройстве. "
+
+
+def no_anchors_page(seed=0, size=1 << 20):
+    """
+    Патент без библиографических сведений и извещений (нет ни одного якоря полей),
+    но с большим телом: шаблоны просматривают всю страницу безрезультатно.
+    """
+
+    rng = random.Random(seed)
+    body = "".join("<p>%s</p>\n" % (_FILLER * rng.randint(1, 8)) for _ in range(size // 300))
+    return "".join([_head(), "<div class=\"top\">%s</div>\n" % _registry_link("RUPAT", rng.randint(2000000, 2800000)),
+                    body, "</body>\n</html>\n"])
+
+
+def long_line_page(seed=0, size=1 << 20):
+    """Свидетельство о регистрации ПрЭВМ, записанное одной строкой, с рефератом размером около size знаков."""
+
+    page = evm_page(seed, notices=5)
+    abstract = "Реферат:</b><br>"
+    page = page.replace(abstract, abstract + _FILLER * (size // len(_FILLER)))
+    return page.replace("\n", "")
+
+
+def backtracking_page(kind="evm", repeats=20, size=1 << 16):
+    """
+    Страница, на которой шаблоны с жадными .+ и .* (правообладатели, извещения ПрЭВМ)
+    многократно доходят до конца длинной строки и возвращаются: repeats незавершённых
+    фрагментов на одной строке длиной около repeats * size знаков.
+    """
+
+    filler = _FILLER * (size // len(_FILLER))
+    if kind == "design":
+        page = design_page(0, notices=0)
+        fragment = "<p>(73) Патентообладатель(и): <b><br>%s</p>" % filler
+        marker = "<table id=\"bib\">"
+    else:
+        page = evm_page(0, notices=0)
+        fragment = "<p class=\"izv\">Изменение сведений о правообладателе</p><p>%s</p>" % filler
+        marker = "</body>"
+    return page.replace(marker, fragment * repeats + "\n" + marker, 1)
+
+
+PAGES = {
+    "patent": patent_page,
+    "design": design_page,
+    "evm": evm_page,
+    "db": db_page,
+    "tims": tims_page,
+}
+
+
+def corpus(size=100, seed=0, kinds=("patent", "design", "evm", "db", "tims")):
+    """Список пар (вид документа, HTML-код) заданного размера."""
+
+    rng = random.Random(seed)
+    return [(kind, PAGES[kind](seed=rng.randrange(10 ** 9))) for kind in (rng.choice(kinds) for _ in range(size))]
@@ -0,0 +1,235 @@
+"""
+Набор бенчмарков и проверка результатов разбора по эталону.
+
+Случаи:
+  - страницы из fixtures/pages (имя файла -- <вид документа>-<название>.html,
+    для заглушек отсутствующих документов -- missing-<название>.html). Это не страницы
+    реестра, а сохранённый вывод генераторов corpus.py: эталон для них фиксирует текущее
+    поведение парсера (регрессии), но не проверяет его на настоящей разметке ФИПС;
+  - синтетические худшие случаи из corpus.py: большие разделы извещений, страница без якорей,
+    страница в одну длинную строку, незавершённые фрагменты, на которых жадные шаблоны
+    возвращаются от конца строки.
+
+Для каждого случая выводятся время загрузки (декодирование и очистка) и разбора, время
+каждого метода find_, пропускная способность, пиковая память (tracemalloc, отдельный прогон)
+и совпадение результата с эталоном fixtures/golden.json (длинные значения хранятся в виде
+хэша SHA-256). Повторы каждого замера ограничены --repeat и бюджетом времени --budget.
+
+Запуск (без сети, из корня репозитория):
+    python benchmarks/suite.py --json results.json
+    python benchmarks/suite.py --update-golden     # после намеренного изменения результатов
+
+Код возврата 1, если результат какого-либо случая отличается от эталона.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from common import ROOT
+from corpus import backtracking_page, design_page, long_line_page, no_anchors_page, patent_page
+
+from fips_open_register_documents_parser.FIPSDocParser import DocumentNotExistsInOpenRegistry, create_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+GOLDEN = os.path.join(FIXTURES, "golden.json")
+
+# Значения длиннее (в JSON) хранятся в эталоне в виде хэша
+GOLDEN_INLINE_LIMIT = 2000
+
+# Синтетические худшие случаи: имя -> (вид документа, функция, создающая страницу)
+SYNTHETIC = {
+    "patent-huge-izv": ("patent", lambda: patent_page(1, notices=3000)),
+    "design-huge-izv": ("design", lambda: design_page(2, notices=2000)),
+    "patent-no-anchors": ("patent", lambda: no_anchors_page(3)),
+    "evm-long-line": ("evm", lambda: long_line_page(4)),
+    "evm-backtracking": ("evm", lambda: backtracking_page("evm")),
+    "design-backtracking": ("design", lambda: backtracking_page("design")),
+}
+
+
+def cases():
+    """Пары (имя случая, (вид документа или None для заглушки, страница в байтах))."""
+
+    pages = os.path.join(FIXTURES, "pages")
+    for filename in sorted(os.listdir(pages)):
+        if filename.endswith(".html"):
+            kind = filename.split("-", 1)[0]
+            with open(os.path.join(pages, filename), "rb") as f:
+                yield filename[:-len(".html")], (None if kind == "missing" else kind, f.read())
+    for name, (kind, make) in SYNTHETIC.items():
+        yield name, (kind, make().encode("utf-8"))
+
+
+def golden_value(value):
+    text = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    if len(text) <= GOLDEN_INLINE_LIMIT:
+        return json.loads(text)
+    return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def snapshot(kind, data, engine):
+    """Результат разбора в виде, сохраняемом в эталоне."""
+
+    try:
+        parser = create_parser(data, kind)
+    except DocumentNotExistsInOpenRegistry:
+        return {"missing": True}
+    parser.parse(engine)
+    return {"missing": False, "fields": {field: golden_value(value) for field, value in parser.parsed.items()}}
+
+
+def best_time(function, repeat, budget):
+    best = None
+    spent = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        if spent >= budget:
+            break
+    return best
+
+
+def measure(kind, data, args):
+    """Замеры одного случая."""
+
+    def load():
+        try:
+            parser = create_parser(data, kind)
+        except DocumentNotExistsInOpenRegistry:
+            return None
+        parser.html_data_min
+        return parser
+
+    def full():
+        parser = load()
+        if parser is not None:
+            parser.parse(args.engine)
+
+    result = {"bytes": len(data)}
+    result["load_ms"] = best_time(load, args.repeat, args.budget) * 1000
+    result["parse_ms"] = best_time(full, args.repeat, args.budget) * 1000
+    result["docs_per_s"] = 1000 / result["parse_ms"]
+    result["mb_per_s"] = len(data) / 2 ** 20 * result["docs_per_s"]
+
+    parser = load()
+    result["methods"] = {}
+    if parser is not None:
+        for method, fields in parser.method_fields.items():
+            elapsed = best_time(getattr(parser, method), args.repeat, args.budget)
+            result["methods"][method] = {"fields": list(fields), "ms": elapsed * 1000}
+
+    tracemalloc.start()
+    full()
+    result["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return result
+
+
+def compare(expected, actual):
+    """Список расхождений с эталоном (имена полей или 'missing')."""
+
+    if expected.get("missing") != actual.get("missing"):
+        return ["missing"]
+    expected_fields = expected.get("fields", {})
+    actual_fields = actual.get("fields", {})
+    return sorted(field for field in expected_fields.keys() | actual_fields.keys()
+                  if expected_fields.get(field) != actual_fields.get(field))
+
+
+def revision():
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, check=True,
+                                    stdout=subprocess.PIPE, universal_newlines=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return head, dirty
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--json", help="файл для результатов в JSON ('-' -- стандартный вывод)")
+    argparser.add_argument("--cases", default="*", help="шаблон имён случаев (fnmatch)")
+    argparser.add_argument("--repeat", type=int, default=10, help="наибольшее число повторов замера")
+    argparser.add_argument("--budget", type=float, default=0.5, help="бюджет времени замера, с")
+    argparser.add_argument("--engine", default=None, help="движок извлечения (см. FIPSDocParser.parse)")
+    argparser.add_argument("--update-golden", action="store_true", help="записать текущие результаты как эталон")
+    args = argparser.parse_args()
+
+    golden = {}
+    if os.path.exists(GOLDEN):
+        with open(GOLDEN, encoding="utf-8") as f:
+            golden = json.load(f)
+
+    report = []
+    out = sys.stderr if args.json == "-" else sys.stdout
+    print("%-22s %9s %9s %9s %9s %9s  %-8s %s" % ("case", "KB", "load ms", "parse ms", "docs/s", "peak KB",
+                                                   "golden", "slowest method"), file=out)
+    for name, (kind, data) in cases():
+        if not fnmatch.fnmatch(name, args.cases):
+            continue
+        actual = snapshot(kind, data, args.engine)
+        if args.update_golden:
+            golden[name] = actual
+        if name in golden:
+            mismatched = compare(golden[name], actual)
+            status = "mismatch" if mismatched else "ok"
+        else:
+            mismatched, status = [], "new"
+        result = dict(name=name, kind=kind, golden=status, mismatched=mismatched, **measure(kind, data, args))
+        report.append(result)
+        slowest = max(result["methods"].items(), key=lambda item: item[1]["ms"], default=None)
+        print("%-22s %9.1f %9.2f %9.2f %9.1f %9.1f  %-8s %s" % (
+            name, result["bytes"] / 1024, result["load_ms"], result["parse_ms"], result["docs_per_s"],
+            result["peak_kb"], status, "%s %.2f ms" % (slowest[0], slowest[1]["ms"]) if slowest else ""), file=out)
+        if mismatched:
+            print("    fields differ from golden: %s" % ", ".join(mismatched), file=out)
+
+    if args.update_golden:
+        with open(GOLDEN, "w", encoding="utf-8") as f:
+            json.dump(golden, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write("\n")
+
+    head, dirty = revision()
+    mismatches = sum(result["golden"] == "mismatch" for result in report)
+    results = {
+        "meta": {
+            "revision": head,
+            "dirty": dirty,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "engine": args.engine,
+            "repeat": args.repeat,
+            "budget": args.budget,
+        },
+        "cases": report,
+        "summary": {
+            "cases": len(report),
+            "mismatches": mismatches,
+            "parse_ms": sum(result["parse_ms"] for result in report),
+        },
+    }
+    if args.json == "-":
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,244 +1,1192 @@
+import codecs
+import copy
+import hashlib
+import html
+import math
+import mmap
+import os
 import re
+import signal
+import threading
+import time
+import types
+from collections import deque, namedtuple
+from functools import lru_cache
 from operator import itemgetter
 
+# Кодировки страниц Открытых реестров ФИПС (в порядке проверки при декодировании)
+ENCODINGS = ('utf-8', 'windows-1251')
+
+# Файлы не меньше этого размера (в байтах) декодируются через отображение в память
+MMAP_THRESHOLD = 1 << 20
+
+# Размер блока (в байтах) при потоковом декодировании страницы
+DECODE_CHUNK_SIZE = 1 << 18
+
+_CHARSET = re.compile(rb"charset=[\"']?([\w-]+)", re.IGNORECASE)
+_TABS = re.compile(r"\t+")
+_LINE_BREAKS = re.compile(r"\r?\n+\s+")
+
 
 class DocumentNotExistsInOpenRegistry(Exception):
     pass
 
 
-class FIPSDocParser:
+class UnknownDocumentType(Exception):
+    """Вид документа не определён или не совпадает с ожидаемым; args -- (ожидаемый вид, определённый вид)."""
+    pass
+
+
+class EngineMismatch(Exception):
+    """Результаты движков извлечения различаются (режим engine='check'); args[0] -- список полей."""
+    pass
+
+
+class _BudgetExceeded(Exception):
+    # выбрасывается обработчиком SIGALRM в методе find_, превысившем бюджет времени
+    pass
+
+
+def _budget_alarm(signum, frame):
+    raise _BudgetExceeded()
+
+
+def _alarm_available():
+    """
+    Можно ли прервать метод по таймеру: SIGALRM доступен (POSIX), вызов выполняется в главном потоке
+    и таймер ITIMER_REAL не занят вызывающим кодом. Модуль re проверяет сигналы во время сопоставления,
+    поэтому таймер прерывает и шаблон с катастрофическим возвратом.
+    """
+
+    return (hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+            and signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0))
+
+
+def normalize(text):
+    """Удаляет из HTML-кода табуляции и переводы строк с последующими отступами."""
+
+    return _LINE_BREAKS.sub("", _TABS.sub(" ", text))
+
+
+def _iter_decoded(buf, encoding, errors):
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    with memoryview(buf) as view:
+        for start in range(0, len(view), DECODE_CHUNK_SIZE):
+            yield decoder.decode(view[start:start + DECODE_CHUNK_SIZE])
+    yield decoder.decode(b"", True)
+
+
+def _iter_normalized(chunks):
+    # Заменяемые фрагменты состоят только из пробельных знаков, поэтому блок,
+    # не оканчивающийся пробельным знаком, можно очищать независимо от следующего;
+    # хвост из пробельных знаков переносится в следующий блок.
+    tail = ""
+    for chunk in chunks:
+        chunk = tail + chunk
+        body = chunk.rstrip()
+        tail = chunk[len(body):]
+        if body:
+            yield normalize(body)
+    if tail:
+        yield normalize(tail)
+
+
+def normalize_html(buf, encoding=None):
+    """
+    Декодирует страницу реестра (bytes, bytearray, memoryview, mmap) и очищает её
+    (см. normalize) за один проход по блокам, не создавая полной копии исходного текста.
+    Без явной кодировки сначала проверяется utf-8, затем кодировка из объявления
+    charset в начале страницы, затем windows-1251.
+    """
+
+    if encoding is not None:
+        encodings = [encoding]
+    else:
+        encodings = list(ENCODINGS)
+        declared = _CHARSET.search(buf[:2048])
+        if declared is not None:
+            declared = declared.group(1).decode('ascii').lower()
+            if declared not in encodings:
+                encodings.insert(1, declared)
+    for i, candidate in enumerate(encodings):
+        last = i == len(encodings) - 1
+        try:
+            return "".join(_iter_normalized(_iter_decoded(buf, candidate, 'replace' if last else 'strict')))
+        except (UnicodeDecodeError, LookupError):
+            if last:
+                raise
+
+
+def compile_patterns(patterns):
+    """
+    Компилирует таблицу шаблонов вида {имя: шаблон} или {имя: (шаблон, флаги)}.
+    """
+
+    compiled = {}
+    for name, pattern in patterns.items():
+        if isinstance(pattern, tuple):
+            compiled[name] = re.compile(*pattern)
+        else:
+            compiled[name] = re.compile(pattern)
+    return compiled
+
+
+# Движки извлечения (см. FIPSDocParser.parse)
+ENGINES = ('full', 'anchors', 'check')
+
+# Поля, значения которых -- списки (остальные поля -- строки)
+LIST_FIELDS = ('izv', 'holders_izv', 'authors_izv', 'title_izv')
+
+# Поля со списками правообладателей и авторов (см. structure_parsed)
+PARTY_FIELDS = ('holders', 'authors', 'holders_izv', 'authors_izv')
+
+# Такие же поля извещений (элементов списка parsed['izv'])
+IZV_PARTY_FIELDS = ('holder', 'authors')
+
+# Правообладатель или автор: имя, код страны (или ''), вид -- 'person' или 'organization'
+Party = namedtuple('Party', ('name', 'country', 'kind'))
+
+_PARTY_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_PARTY_TAG = re.compile(r"<[^>]*>")
+_PARTY_AFTER_COUNTRY = re.compile(r"(?<=\([A-Z]{2}\))\s*[,;]")
+_PARTY_COUNTRY = re.compile(r"\(([A-Z]{2})\)$")
+# Признаки организации: кавычки и организационно-правовые формы
+_ORGANIZATION = re.compile(
+    r"[\"«»“”]|\b(?:ООО|ОАО|ЗАО|ПАО|НАО|АО|ФГУП|ФГБУ|ФГБОУ|ФГАОУ|ГУП|МУП|НИИ|НПО|НПП|"
+    r"LTD|LLC|INC|GMBH|CORP|AG|SA|AB|OY|BV|NV|PLC|KG|SE|SAS|SPA|SRL|KK)\b",
+    re.IGNORECASE)
+
+# Слова-названия организаций в распространённых падежах (и в конце составного слова: «Техноцентр»);
+# окончания перечислены явно, чтобы не считать организациями фамилии (Центров, Компаниец)
+_ORGANIZATION_WORD = re.compile(
+    r"(?:(?:обществ|министерств|агентств)(?:о|а|у|ом|е)|"
+    r"(?:предприяти|учреждени|объединени)(?:е|я|ю|ем|и)|"
+    r"(?:академи|компани|корпораци|лаборатори|ассоциаци)(?:я|и|ю|ей)|"
+    r"(?:университет|институт|завод|центр|фонд|концерн|холдинг)(?:а|у|ом|е)?|фирм(?:а|ы|е|у|ой)|"
+    r"limited|company|corporation|universit(?:y|ies|ät|at|é|e|à|a|as)|institut(?:e|es|o|a)?|gesellschaft|kaisha|"
+    r"laborator(?:y|ies|io|ios|ium|oire|oires|ien)|foundation)\b",
+    re.IGNORECASE)
+
+# Фамилия с инициалами ('Фонда Д.', 'Смит Дж.Р.', 'И.И. Иванов') -- имя человека,
+# даже если фамилия совпадает со словом-названием организации
+_PERSON = re.compile(r"(?:\w[\w'-]*\s+(?:\w{1,2}\.\s*){1,2}|(?:\w{1,2}\.\s*){1,2}\w[\w'-]*)\Z")
+
+
+def _party_kind(entry):
+    if _ORGANIZATION.search(entry) is not None:
+        return 'organization'
+    if _ORGANIZATION_WORD.search(entry) is not None and _PERSON.match(entry) is None:
+        return 'organization'
+    return 'person'
+
+
+class PartyDictionary:
+    """
+    Словарь правообладателей и авторов для партии документов: одинаковые записи Party
+    хранятся одним объектом (intern), каждой записи присваивается номер (encode, parties).
+    """
 
     def __init__(self):
+        self.parties = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.parties)
+
+    def encode(self, party):
+        """Номер записи party (новые записи добавляются в конец списка parties)."""
+
+        code = self.codes.get(party)
+        if code is None:
+            code = self.codes[party] = len(self.parties)
+            self.parties.append(party)
+        return code
+
+    def intern(self, party):
+        """Запись словаря, равная party."""
+
+        return self.parties[self.encode(party)]
+
+
+def _split_commas(text):
+    # запятые внутри кавычек и скобок не разделяют записи
+    entries = []
+    depth = 0
+    quoted = False
+    start = 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif char in '«(':
+            depth += 1
+        elif char in '»)':
+            depth -= 1
+        elif char == ',' and depth <= 0 and not quoted:
+            entries.append(text[start:i])
+            start = i + 1
+    entries.append(text[start:])
+    return entries
+
+
+def _country(entry):
+    # код страны в скобках в конце записи: 'Иванов И.И. (RU)'
+    return _PARTY_COUNTRY.match(entry, max(0, len(entry) - 4))
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_fragment(fragment):
+    # одни и те же фрагменты повторяются в документах партии, поэтому разбор кэшируется
+    result = []
+    for line in _PARTY_BREAK.split(fragment):
+        line = html.unescape(_PARTY_TAG.sub("", line))
+        for chunk in _PARTY_AFTER_COUNTRY.split(line):
+            for entry in _split_commas(chunk) if _country(chunk.rstrip(" ,;")) is None else [chunk]:
+                entry = " ".join(entry.split()).strip(",;")
+                if not entry:
+                    continue
+                country = _country(entry)
+                if country is not None:
+                    entry, country = entry[:country.start()].rstrip(" ,"), country.group(1)
+                result.append(Party(entry, country or '', _party_kind(entry)))
+    return tuple(result)
+
+
+def split_parties(value, parties=None):
+    """
+    Разбивает фрагмент HTML со списком правообладателей или авторов
+    (например, 'Иванов И.И. (RU),<br>Петров П.П. (RU)') на записи Party.
+    Записи разделяются переводами строк <br> и запятыми (кроме запятых в кавычках и скобках);
+    value -- строка или список строк (в т.ч. уже разбитых записей Party),
+    parties -- PartyDictionary для объединения повторяющихся записей или None.
+    """
+
+    if isinstance(value, str):
+        value = [value]
+    result = []
+    for item in value:
+        result.extend((item,) if isinstance(item, Party) else _parse_fragment(item))
+    if parties is not None:
+        result = [parties.intern(party) for party in result]
+    return result
+
+
+def structure_parsed(parsed, parties=None):
+    """
+    Заменяет в словаре parsed значения полей PARTY_FIELDS (и IZV_PARTY_FIELDS извещений)
+    списками записей Party (см. split_parties). Повторный вызов лишь объединяет записи
+    со словарём parties. Возвращает parsed.
+    """
+
+    for field in PARTY_FIELDS:
+        value = parsed.get(field)
+        if value is not None:
+            parsed[field] = split_parties(value, parties)
+    for izv in parsed.get('izv', ()):
+        for field in IZV_PARTY_FIELDS:
+            value = izv.get(field)
+            if value is not None:
+                izv[field] = split_parties(value, parties)
+    return parsed
+
+
+# Замер метода find_ (см. FIPSDocParser.profiler): класс парсера, метод, заполняемые им поля,
+# время в секундах, размер документа (знаков html_data), найдено ли непустое значение, парсер
+FieldTiming = namedtuple('FieldTiming', ('parser_class', 'method', 'fields', 'seconds', 'size', 'matched', 'parser'))
+
+# Документ, на котором метод работал дольше порога (см. FieldProfiler); reg_number -- номер
+# регистрации из результата разбора (None, если поле не извлекалось или не найдено)
+SlowField = namedtuple('SlowField', ('parser_class', 'method', 'seconds', 'size', 'reg_number'))
+
+
+class FieldProfiler:
+    """
+    Накопитель замеров методов find_: назначается атрибуту profiler парсера
+    (или класса -- тогда замеряются все его экземпляры и подклассы).
+
+    Время каждого метода учитывается в гистограмме с логарифмическими интервалами
+    (погрешность процентилей -- не больше 10 %), поэтому память не зависит от числа документов.
+
+    threshold -- порог времени метода в секундах: документы, на которых метод работал дольше,
+    записываются в slow (не больше max_slow последних) и передаются в on_slow(timing) --
+    например, чтобы сохранить страницу timing.parser.html_data как тестовый случай.
+    """
+
+    # нижняя граница гистограммы (с) и отношение границ соседних интервалов
+    RESOLUTION = 1e-7
+    GROWTH = 1.1
+
+    def __init__(self, threshold=None, on_slow=None, max_slow=100):
+        self.threshold = threshold
+        self.on_slow = on_slow
+        self.stats = {}
+        self.slow = deque(maxlen=max_slow)
+
+    def __call__(self, timing):
+        key = (timing.parser_class, timing.method)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = {'count': 0, 'seconds': 0.0, 'max': 0.0, 'matched': 0, 'size': 0,
+                                       'histogram': {}}
+        seconds = timing.seconds
+        stats['count'] += 1
+        stats['seconds'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        stats['matched'] += bool(timing.matched)
+        stats['size'] += timing.size
+        bucket = int(math.log(seconds / self.RESOLUTION, self.GROWTH)) if seconds > self.RESOLUTION else 0
+        stats['histogram'][bucket] = stats['histogram'].get(bucket, 0) + 1
+        if self.threshold is not None and seconds > self.threshold:
+            self.slow.append(SlowField(timing.parser_class, timing.method, seconds, timing.size,
+                                       timing.parser.parsed.get('reg_number')))
+            if self.on_slow is not None:
+                self.on_slow(timing)
+
+    def percentile(self, key, percent):
+        """Процентиль percent времени метода key = (класс парсера, метод), в секундах."""
+
+        stats = self.stats[key]
+        rank = math.ceil(stats['count'] * percent / 100)
+        seen = 0
+        for bucket in sorted(stats['histogram']):
+            seen += stats['histogram'][bucket]
+            if seen >= rank:
+                return min(self.RESOLUTION * self.GROWTH ** (bucket + 1), stats['max'])
+        return stats['max']
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        Сводка по методам: {(класс парсера, метод): {'count', 'seconds', 'mean', 'p50', ..., 'max',
+        'matched' -- доля документов с найденным значением, 'size' -- средний размер документа}}.
+        """
+
+        summary = {}
+        for key, stats in sorted(self.stats.items()):
+            count = stats['count']
+            item = {'count': count, 'seconds': stats['seconds'], 'mean': stats['seconds'] / count}
+            for percent in percentiles:
+                item['p%g' % percent] = self.percentile(key, percent)
+            item.update({'max': stats['max'], 'matched': stats['matched'] / count, 'size': stats['size'] / count})
+            summary[key] = item
+        return summary
+
+    def reset(self):
+        """Удаляет накопленные замеры."""
+
+        self.stats.clear()
+        self.slow.clear()
+
+
+def _update_code_digest(digest, code):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code_digest(digest, const)
+        elif isinstance(const, frozenset):
+            # порядок элементов множества зависит от PYTHONHASHSEED
+            digest.update(repr(sorted(map(repr, const))).encode('utf-8'))
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def _class_functions(klass):
+    for name, value in sorted(klass.__dict__.items()):
+        if isinstance(value, (staticmethod, classmethod)):
+            value = value.__func__
+        if isinstance(value, property):
+            functions = [value.fget, value.fset]
+        else:
+            functions = [value]
+        for function in functions:
+            if isinstance(function, types.FunctionType):
+                yield name, function
+
+
+class FIPSDocResult:
+    """
+    Результат разбора документа с ленивым вычислением полей: поле извлекается
+    при первом обращении к нему (вызовом соответствующего метода find_ парсера)
+    и сохраняется в слоте. Классы результатов для каждого парсера создаются
+    метаклассом FIPSDocParserMeta (атрибут result_class парсера), их слоты -- поля документа.
+    """
+
+    __slots__ = ('_parser', '_engine')
+
+    # поля документа в порядке их заполнения методом FIPSDocParser.parse
+    fields = ()
+
+    def __init__(self, parser, engine=None):
+        self._parser = parser
+        self._engine = engine
+
+    def __getattr__(self, name):
+        # вызывается только для ещё не вычисленных полей; служебные имена (в том числе слоты
+        # _parser и _engine до инициализации, например при копировании) здесь не вычисляются
+        if name.startswith('_'):
+            raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+        parser = self._parser
+        method = parser.field_methods.get(name)
+        if method is None:
+            raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+        parser.parse(self._engine, fields=[name])
+        for field in parser.method_fields[method]:
+            setattr(self, field, parser.parsed.get(field))
+        return object.__getattribute__(self, name)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.as_dict())
+
+    def __reduce__(self):
+        # классы результатов создаются метаклассом и не доступны по имени в модуле:
+        # результат восстанавливается по классу парсера, странице и уже вычисленным полям
+        computed = {}
+        for field in self.fields:
+            try:
+                computed[field] = object.__getattribute__(self, field)
+            except AttributeError:
+                pass
+        return _restore_result, (type(self._parser), self._parser.html_data, self._engine, computed)
+
+    def as_dict(self):
+        """Все поля документа в виде словаря (как FIPSDocParser.parsed после parse())."""
+
+        for field in self.fields:
+            getattr(self, field)
+        parsed = self._parser.parsed
+        return {field: parsed[field] for field in self.fields if field in parsed}
+
+
+def _restore_result(parser_class, html_data, engine, computed):
+    parser = parser_class()
+    parser.html_data = html_data
+    result = parser.result_class(parser, engine)
+    parser.parsed.update(computed)
+    for field, value in computed.items():
+        setattr(result, field, value)
+    return result
+
+
+class FIPSDocParserMeta(type):
+    """
+    Метакласс парсеров: при создании класса объединяет таблицы patterns
+    всех классов иерархии (в порядке MRO) и компилирует их один раз в compiled_patterns.
+    Подкласс может переопределить или дополнить отдельные элементы таблицы.
+    Так же объединяются таблица якорей anchors (см. FIPSDocParser.parse),
+    таблица извлечения сведений из извещений izv_extractors (compiled_extractors и
+    коды отбираемых извещений izv_codes, см. FIPSDocPatentBaseParser)
+    и таблица method_fields, по которой строятся соответствие полей методам find_
+    (field_methods) и класс ленивого результата result_class.
+
+    find_methods -- пары (имя, функция) методов find_ класса в порядке их вызова в parse():
+    по алфавиту имён. Список строится один раз при создании класса.
+
+    pattern_version -- отпечаток шаблонов, якорей, атрибута version и кода методов
+    всех классов иерархии: меняется при любом изменении, влияющем на результат разбора
+    (используется как часть ключа кэша, см. модуль cache).
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        patterns = {}
+        anchors = {}
+        declared_fields = {}
+        extractors = {}
+        for klass in reversed(cls.__mro__):
+            patterns.update(klass.__dict__.get('patterns', {}))
+            anchors.update(klass.__dict__.get('anchors', {}))
+            declared_fields.update(klass.__dict__.get('method_fields', {}))
+            extractors.update(klass.__dict__.get('izv_extractors', {}))
+        cls.compiled_patterns = compile_patterns(patterns)
+        # код извещения -> ((поле, (шаблон, ...)), ...); None в таблице подкласса исключает код
+        cls.compiled_extractors = {
+            code: tuple((field, tuple(cls.compiled_patterns[name] for name in names))
+                        for field, names in extractor.items())
+            for code, extractor in extractors.items() if extractor is not None
+        }
+        cls.izv_codes = frozenset(cls.compiled_extractors)
+        # для шаблонов с флагом IGNORECASE якорь дополнительно ищется без учёта регистра
+        cls.compiled_anchors = {}
+        for pattern_name, (literal, lead) in anchors.items():
+            if cls.compiled_patterns[pattern_name].flags & re.IGNORECASE:
+                literal_re = re.compile(re.escape(literal), re.IGNORECASE)
+            else:
+                literal_re = None
+            cls.compiled_anchors[pattern_name] = (literal, lead, literal_re)
+        # поля, заполняемые методами find_ (по умолчанию -- имя метода без префикса)
+        cls.method_fields = {}
+        cls.field_methods = {}
+        for method in sorted(n for n in dir(cls) if n.startswith("find_") and callable(getattr(cls, n))):
+            cls.method_fields[method] = tuple(declared_fields.get(method, (method[len("find_"):],)))
+            for field in cls.method_fields[method]:
+                cls.field_methods[field] = method
+        cls.find_methods = tuple((method, getattr(cls, method)) for method in cls.method_fields)
+        result_name = (name[:-len("Parser")] if name.endswith("Parser") else name) + "Result"
+        cls.result_class = type(result_name, (FIPSDocResult,), {
+            '__slots__': tuple(cls.field_methods),
+            '__module__': cls.__module__,
+            '__doc__': "Ленивый результат разбора %s (см. FIPSDocResult)." % name,
+            'fields': tuple(cls.field_methods),
+        })
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(repr((
+            sorted((key, value.pattern, value.flags) for key, value in cls.compiled_patterns.items()),
+            sorted(anchors.items()),
+            sorted(cls.method_fields.items()),
+            sorted((code, sorted(extractor.items())) for code, extractor in extractors.items() if extractor is not None),
+            getattr(cls, 'version', None),
+        )).encode('utf-8'))
+        for klass in cls.__mro__[:-1]:
+            for function_name, function in _class_functions(klass):
+                digest.update(function_name.encode('utf-8'))
+                _update_code_digest(digest, function.__code__)
+        cls.pattern_version = digest.hexdigest()
+
+
+# Извещение об изменениях в патенте (общий шаблон для патентов и промышленных образцов)
+IZV_PATTERN = (r"<p class=\"NameIzv\">"
+               r"(?P<full_name>(?:(?P<code>[A-Z\d]{4}?) (?:\- )?)?(?P<name>.+?))</p>"
+               r"(<p class=\"izv2\"></p>)?"
+               r"(?P<text>.+?)"  # текст извещения до даты внесения записи в Госреестр
+               r"<p class=\"izv\">(?:Дата публикации|Извещение опубликовано|Дата публикации и номер бюллетеня): <b>.*?"
+               r"(?P<pub_date>\d{2}\.\d{2}\.\d{4}?)</[a-z]>",
+               re.IGNORECASE)
+
+
+# Начало извещения (код извещения без захвата его текста)
+IZV_HEAD_PATTERN = (r"<p class=\"NameIzv\">(?:(?P<code>[A-Z\d]{4}?) (?:\- )?)?", re.IGNORECASE)
+
+_IZV_START = re.compile(re.escape("<p class=\"NameIzv\">"), re.IGNORECASE)
+
+
+def izv_signature(izv):
+    """
+    Подпись извещения (словаря из списка parsed['izv']): не меняется от разбора к разбору
+    и служит отметкой последнего обработанного извещения (см. FIPSDocPatentBaseParser.new_izv).
+    """
+
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update("\x1f".join((izv['full_name'], izv['pub_date'], izv['text'])).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _date_key(value):
+    # дата вида ДД.ММ.ГГГГ или datetime.date
+    if isinstance(value, str):
+        day, month, year = value.split('.')
+        return int(year), int(month), int(day)
+    return value.year, value.month, value.day
+
+
+# Шаблоны извлечения новых патентообладателей и авторов из текста извещения
+IZV_EXTRACT_PATTERNS = {
+    'izv_tk4a_holder': (r"<p class=\"izv\">Следует читать.+?"
+                        r"\(73\) Патентообладатель\(и\):\s*"
+                        r"<br>(?:<b>)?(.+?)(?:</ru-[a-z\d]+>|</b>|<br>)", re.IGNORECASE),
+    'izv_tk4a_authors': (r"<p class=\"izv\">Следует читать.+?"
+                         r"\(72\) Автор\(ы\):\s*"
+                         r"<br>(?:<b>)?(.+?)(?:</b>|<br>)", re.IGNORECASE),
+    # пример:
+    # <p class="izv">Следует читать: <b><ru-b906i>(72) иванов, Петров, Сидоров</ru-b906i></b></p>
+    'izv_tk4a_authors_alt': (r"<p class=\"izv\">Следует читать.+?"
+                             r"(?:<b>)?(?:<ru\-[\da-z]+>)?"
+                             r"\(72\)\s*(?:<b>)?(.+?)(?:</ru\-[\da-z]+>)?(?:</b>|<br>|</p>)", re.IGNORECASE),
+    'izv_tc4a_authors': (r"\(72\) Автор\(ы\):\s*"
+                         r"<br><b>(.+?)</b>", re.IGNORECASE),
+    'izv_pd4a_holder': (r"\(73\) (?:Нов[а-яё]{2}\s+)?(?:\s*наименование\s+)?Патентообладател[ь|я](?:\(и\))?:<br><b>(.+?)</b>",
+                        re.IGNORECASE),
+    'izv_pc4a_holder': (r"\(73\) (?:Новый\s+)?Патентообладатель(?:\(и\))?:<br><b>(.+?)</b>", re.IGNORECASE),
+}
+
+
+class FIPSDocParser(metaclass=FIPSDocParserMeta):
+
+    # Шаблоны извлечения полей: компилируются один раз при создании класса (см. FIPSDocParserMeta)
+    patterns = {
+        # проверяется по исходному (ненормализованному) тексту, см. html_data
+        'missing': r"Документ\s+с\s+данным\s+номером\s+отсутствует",
+        'reg_number': r"<a title=\"Ссылка на реестр \(открывается в отдельном окне\).+DocNumber=(.+?)&amp;TypeFile=html",
+        'reg_date': r"<p>Дата регистрации:[\s\n\t]*(?:<br>)?[\s\n\t]*<b>(\d{2}\.\d{2}\.\d{4})</b>",
+    }
+
+    # Якоря шаблонов для движка engine='anchors': {имя шаблона: (подстрока, смещение)}.
+    # Подстрока обязана входить в любое совпадение шаблона; смещение -- максимальное число
+    # знаков от начала совпадения до подстроки (None, если не ограничено: тогда якорь
+    # лишь позволяет пропустить шаблон, если подстроки в документе нет).
+    # Буквальное начало шаблона -- тоже полезный якорь: str.find находит его быстрее,
+    # чем модуль re, который проверяет каждую позицию документа.
+    # Движок не ограничивает поиск разделом страницы: жадные шаблоны (например, (.+)</b>)
+    # захватывают текст до последнего вхождения окончания в строке, и поиск в разделе изменил бы результат.
+    anchors = {
+        'reg_number': ("<a title=\"Ссылка на реестр (открывается в отдельном окне)", 0),
+        'reg_date': ("<p>Дата регистрации:", 0),
+    }
+
+    # Движок извлечения по умолчанию: 'full', 'anchors' или 'check'
+    engine = 'full'
+
+    # Разбивать ли списки правообладателей и авторов на записи Party (см. structure_parsed)
+    structured = False
+
+    # Словарь записей Party, общий для документов партии (PartyDictionary), или None
+    parties = None
+
+    # Бюджет времени одного метода find_ в секундах (см. parse) или None -- без ограничения
+    budget = None
+
+    # Получатель замеров методов find_ (вызывается с FieldTiming каждого метода по завершении
+    # разбора документа, например FieldProfiler) или None -- без замеров
+    profiler = None
+
+    # Поля, заполняемые методами find_, если они отличаются от имени метода без префикса
+    method_fields = {}
+
+    # Вид документа (ключ PARSERS); наследуется подклассами, у базовых классов -- None
+    doc_type = None
+
+    # Версия парсера: входит в pattern_version (см. FIPSDocParserMeta). Изменения шаблонов
+    # и методов класса учитываются автоматически; версию нужно увеличить при изменении,
+    # влияющем на результат извне класса (например, функции normalize).
+    version = 1
+
+    def __init__(self):
+        self.__raw_html_data = None
         self.__html_data = None
         self.__html_data_min = None
+        self.__anchor_positions = {}
+        self.__anchored = False
         self.parsed = None
+        self.overrun = []
+        self.izv_watermark = None
 
     @property
     def html_data(self):
+        """
+        HTML-документ, очищенный от лишних знаков.
+        Очистка выполняется при первом обращении, после чего исходный текст освобождается.
+        """
+
+        if self.__html_data is None and self.__raw_html_data is not None:
+            self.__html_data = normalize(self.__raw_html_data)
+            self.__raw_html_data = None
         return self.__html_data
 
     @property
     def html_data_min(self):
+        """html_data без переводов строк (строится при первом обращении)."""
+
+        if self.__html_data_min is None and self.html_data is not None:
+            self.__html_data_min = self.__html_data.replace("\n", "")
         return self.__html_data_min
 
     @html_data.setter
     def html_data(self, value):
         """
-        Выполняет очистку HTML-документа от лишних знаков и
+        Принимает HTML-документ (str или bytes) и
         выбрасывает исключение DocumentNotExistsInOpenRegistry в случае,
         если документ содержит указание на отсутствие документа в Реестре ФИПС.
         """
 
-        value = str(value)
-        value = re.sub(r"\t+", " ", value)
-        value = re.sub(r"\r?\n+\s+", "", value)
-        self.__html_data = value
-        self.__html_data_min = "".join(self.html_data.split("\n"))
+        if isinstance(value, (bytes, bytearray, memoryview, mmap.mmap)):
+            self.feed_bytes(value)
+        else:
+            self.__load(str(value), None)
+
+    def reset(self):
+        """
+        Освобождает текущий документ и результаты его разбора. Экземпляр можно использовать
+        для следующего документа и без вызова reset(): передача новой страницы заменяет прежнюю.
+        """
+
+        self.__raw_html_data = None
+        self.__html_data = None
+        self.__html_data_min = None
+        self.__anchor_positions = {}
+        self.parsed = None
+        self.overrun = []
+        self.izv_watermark = None
+
+    def __load(self, raw, normalized):
+        self.__raw_html_data = raw
+        self.__html_data = normalized
+        self.__html_data_min = None
+        self.__anchor_positions = {}
         self.parsed = {}
-        # print(self.html_data)
-        if re.search(r'Документ с данным номером отсутствует', self.__html_data) is not None:
+        if self.compiled_patterns['missing'].search(raw if normalized is None else normalized) is not None:
             raise DocumentNotExistsInOpenRegistry()
 
-    def parse(self):
+    def feed_bytes(self, buf, encoding=None):
+        """Передаёт в парсер HTML-документ в виде байтов (см. normalize_html)."""
+
+        self.__load(None, normalize_html(buf, encoding))
+
+    def feed_file(self, path, encoding=None):
+        """
+        Передаёт в парсер сохранённую страницу реестра.
+        Крупные файлы (от MMAP_THRESHOLD байт) декодируются прямо из отображения в память,
+        без промежуточной копии в виде bytes.
+        """
+
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    self.feed_bytes(buf, encoding)
+            else:
+                self.feed_bytes(f.read(), encoding)
+
+    def _anchor_position(self, name, text):
+        """
+        Позиция, с которой имеет смысл искать шаблон name в тексте text
+        (html_data или html_data_min), или -1, если якоря шаблона в тексте нет.
+        """
+
+        literal, lead, literal_re = self.compiled_anchors[name]
+        key = (literal, literal_re is not None, text is self.__html_data)
+        position = self.__anchor_positions.get(key)
+        if position is None:
+            position = text.find(literal)
+            if literal_re is not None:
+                # вхождение в другом регистре может оказаться раньше найденного
+                match = literal_re.search(text, 0, position + len(literal) if position >= 0 else len(text))
+                position = match.start() if match is not None else -1
+            self.__anchor_positions[key] = position
+        if position > 0:
+            return 0 if lead is None else max(0, position - lead)
+        return position
+
+    def _start(self, name, text):
+        """Начальная позиция поиска шаблона name в режиме engine='anchors' (-1 -- якоря в тексте нет)."""
+
+        if name in self.compiled_anchors and (text is self.__html_data or text is self.__html_data_min):
+            return self._anchor_position(name, text)
+        return 0
+
+    def _search(self, name, text=None):
+        """Поиск по шаблону name из таблицы patterns (по умолчанию в html_data)."""
+
+        text = self.html_data if text is None else text
+        if not self.__anchored:
+            return self.compiled_patterns[name].search(text)
+        position = self._start(name, text)
+        return self.compiled_patterns[name].search(text, position) if position >= 0 else None
+
+    def _findall(self, name, text=None):
+        """Все совпадения шаблона name (по умолчанию в html_data)."""
+
+        text = self.html_data if text is None else text
+        if not self.__anchored:
+            return self.compiled_patterns[name].findall(text)
+        position = self._start(name, text)
+        return self.compiled_patterns[name].findall(text, position) if position >= 0 else []
+
+    def _finditer(self, name, text=None):
+        """Итератор совпадений шаблона name (по умолчанию в html_data)."""
+
+        text = self.html_data if text is None else text
+        if not self.__anchored:
+            return self.compiled_patterns[name].finditer(text)
+        position = self._start(name, text)
+        return self.compiled_patterns[name].finditer(text, position) if position >= 0 else iter(())
+
+    def parse(self, engine=None, fields=None, structured=None, budget=None):
         """
         Выполняет парсинг свидетельства/патента.
         автоматически вызывает все методы класса, которые начинаются с find_
+
+        engine -- движок извлечения (по умолчанию атрибут engine):
+        'full' -- каждый шаблон ищется во всём документе;
+        'anchors' -- шаблон ищется с первого вхождения его якоря (таблица anchors),
+        а при отсутствии якоря в документе не выполняется вовсе;
+        'check' -- выполняются оба движка, при расхождении результатов
+        выбрасывается исключение EngineMismatch.
+
+        Методы find_ вызываются в порядке find_methods (по алфавиту имён).
+
+        fields -- список нужных полей: вызываются только заполняющие их методы find_
+        (в parsed попадут и другие поля, заполняемые теми же методами).
+
+        structured -- разбить списки правообладателей и авторов на записи Party
+        (по умолчанию атрибут structured; повторяющиеся записи объединяются словарём parties).
+
+        budget -- бюджет времени одного метода find_ в секундах (по умолчанию атрибут budget).
+        Метод, превысивший бюджет, прерывается (в главном потоке POSIX -- по таймеру,
+        иначе превышение обнаруживается по его завершении), заполняемые им поля
+        получают пустые значения, а их имена -- в списке overrun; остальные поля разбираются как обычно.
+        """
+
+        engine = engine or self.engine
+        if engine not in ENGINES:
+            raise ValueError("Неизвестный движок извлечения: %s" % engine)
+        structured = self.structured if structured is None else structured
+        budget = self.budget if budget is None else budget
+        if engine == 'check':
+            # оба прохода -- в пустые словари: поля прежних вызовов не участвуют в сравнении
+            previous = self.parsed
+            try:
+                self.parsed = {}
+                self.parse('full', fields, structured, budget)
+                expected, self.parsed = self.parsed, {}
+                self.parse('anchors', fields, structured, budget)
+                actual = self.parsed
+            finally:
+                self.parsed = previous
+            mismatched = sorted(key for key in expected.keys() | actual.keys()
+                                if key not in expected or key not in actual or expected[key] != actual[key])
+            if mismatched:
+                raise EngineMismatch(mismatched)
+            self.parsed.update(actual)
+            return
+
+        if fields is None:
+            methods = self.find_methods
+        else:
+            unknown = [field for field in fields if field not in self.field_methods]
+            if unknown:
+                raise ValueError("Неизвестные поля документа: %s" % ", ".join(unknown))
+            names = {self.field_methods[field] for field in fields}
+            methods = [(name, method) for name, method in self.find_methods if name in names]
+
+        profiler = self.profiler
+        self.overrun = []
+        self.__anchored = engine == 'anchors'
+        try:
+            if profiler is None and budget is None:
+                for _, method in methods:
+                    method(self)
+            else:
+                self.__run_measured(methods, profiler, budget)
+        finally:
+            self.__anchored = False
+        if structured:
+            structure_parsed(self.parsed, self.parties)
+
+    def __run_measured(self, methods, profiler, budget):
+        # вызов методов с замерами (profiler) и/или с ограничением времени (budget)
+        size = len(self.html_data)
+        name = type(self).__name__
+        alarm = budget is not None and _alarm_available()
+        # замеры передаются после всех методов: получатель видит заполненный parsed
+        timings = []
+        if alarm:
+            previous = signal.signal(signal.SIGALRM, _budget_alarm)
+        try:
+            for method_name, method in methods:
+                fields = self.method_fields[method_name]
+                started = time.perf_counter()
+                try:
+                    try:
+                        if alarm:
+                            signal.setitimer(signal.ITIMER_REAL, budget)
+                        method(self)
+                    finally:
+                        if alarm:
+                            signal.setitimer(signal.ITIMER_REAL, 0)
+                except _BudgetExceeded:
+                    overrun = True
+                else:
+                    overrun = budget is not None and time.perf_counter() - started > budget
+                seconds = time.perf_counter() - started
+                if overrun:
+                    for field in fields:
+                        self.parsed[field] = [] if field in LIST_FIELDS else ''
+                    self.overrun.extend(fields)
+                if profiler is not None:
+                    timings.append(FieldTiming(name, method_name, fields, seconds, size,
+                                               any(self.parsed.get(field) for field in fields), self))
+        finally:
+            if alarm:
+                signal.signal(signal.SIGALRM, previous)
+            for timing in timings:
+                profiler(timing)
+
+    def result(self, engine=None):
         """
-        for func in dir(self):
-            f = getattr(self, func)
-            if callable(f) and func.startswith("find_"):
-                f()
+        Ленивый результат разбора текущего документа (экземпляр result_class):
+        поля извлекаются при первом обращении к ним. Результат не зависит от
+        последующей передачи в парсер других документов.
+        """
+
+        self.html_data
+        snapshot = copy.copy(self)
+        snapshot.parsed = {}
+        return self.result_class(snapshot, engine)
 
     def find_reg_number(self):
         """Номер регистрации."""
 
-        data = re.search(
-            r"<a title=\"Ссылка на реестр \(открывается в отдельном окне\).+DocNumber=(.+?)&amp;TypeFile=html",
-            self.html_data)
+        data = self._search('reg_number')
         self.parsed['reg_number'] = data.group(1) if data is not None else ''
 
     def find_reg_date(self):
         """Дата регистрации."""
 
-        data = re.search(r"<p>Дата регистрации:[\s\n\t]*(?:<br>)?[\s\n\t]*<b>(\d{2}\.\d{2}\.\d{4})</b>", self.html_data)
+        data = self._search('reg_date')
         self.parsed['reg_date'] = data.group(1) if data is not None else ''
 
 
-class FIPSDocPatentDesignParser(FIPSDocParser):
+class FIPSDocPatentBaseParser(FIPSDocParser):
+    """
+    Общая часть парсеров патентов на изобретения, полезные модели и промышленные образцы:
+    извещения об изменениях. Отбираются извещения с кодами из таблицы izv_extractors,
+    сведения из текста извещения извлекаются по шаблонам, указанным в ней для кода.
+    """
+
+    patterns = {
+        'izv': IZV_PATTERN,
+        'izv_head': IZV_HEAD_PATTERN,
+        **IZV_EXTRACT_PATTERNS,
+    }
+
+    anchors = {
+        'izv': ("<p class=\"NameIzv\">", 0),
+    }
+
+    # Извещения, связанные с изменением данных о правообладателях и авторах:
+    # {код извещения: {поле: (имя шаблона, ...)}}. Шаблоны поля проверяются по порядку
+    # до первого непустого значения (группа 1), иначе значение поля -- пустая строка.
+    # Таблицы классов иерархии объединяются (см. FIPSDocParserMeta).
+    izv_extractors = {
+        'TK4A': {'holder': ('izv_tk4a_holder',), 'authors': ('izv_tk4a_authors', 'izv_tk4a_authors_alt')},
+        'TC4A': {'authors': ('izv_tc4a_authors',)},
+        'PD4A': {'holder': ('izv_pd4a_holder',)},
+        'PC4A': {'holder': ('izv_pc4a_holder',)},
+    }
+
+    def find_izv(self):
+        """Извещения об изменениях в патенте."""
+
+        # Оставляем извещения, связанные с изменением данных о правообладателях и авторах
+        codes = self.izv_codes
+        self.parsed['izv'] = [x for x in [m.groupdict() for m in self._finditer('izv', self.html_data_min)]
+                              if x['code'] in codes]
+        self.extract_izv()
+
+    def extract_izv(self):
+        """Извлечение имён новых авторов и/или патентообладателей."""
+
+        for izv in self.parsed['izv']:
+            self._extract_notice(izv)
+        self.parsed['izv'] = sorted(self.parsed['izv'], key=itemgetter('pub_date'), reverse=True)
+
+    def _extract_notice(self, izv):
+        """Извлечение сведений из извещения izv (элемента списка parsed['izv']) по таблице izv_extractors."""
+
+        text = izv['text']
+        for field, patterns in self.compiled_extractors.get(izv['code'], ()):
+            value = ''
+            for pattern in patterns:
+                data = pattern.search(text)
+                value = data.group(1) if data is not None else ''
+                if value:
+                    break
+            izv[field] = value
+
+    def new_izv(self, since=None, signature=None):
+        """
+        Извещения, опубликованные после отметки: даты since (строка ДД.ММ.ГГГГ или datetime.date;
+        извещения с этой датой и более ранние не возвращаются) и/или извещения с подписью
+        signature (отметка izv_watermark предыдущего вызова).
+
+        Извещения просматриваются с конца страницы, где ФИПС размещает новые, и просмотр
+        прекращается на первом отобранном извещении не новее отметки. Код извещения
+        проверяется до разбора его текста, каждое извещение разбирается в пределах своего блока.
+        Возвращает список в том же виде, что и parsed['izv'] после parse(), от новых к старым
+        по дате публикации (при равных датах -- от последнего на странице).
+
+        После вызова izv_watermark -- подпись последнего на странице отобранного извещения
+        (None, если таких нет): её следует сохранить как signature для следующего вызова.
+        Первый элемент списка для этого не годится, если даты на странице идут не по порядку.
+        """
+
+        text = self.html_data_min
+        since = _date_key(since) if since is not None else None
+        head = self.compiled_patterns['izv_head']
+        pattern = self.compiled_patterns['izv']
+        starts = [m.start() for m in _IZV_START.finditer(text)]
+        notices = []
+        self.izv_watermark = None
+        end = len(text)
+        for start in reversed(starts):
+            block_end, end = end, start
+            if head.match(text, start).group('code') not in self.izv_codes:
+                continue
+            match = pattern.match(text, start, block_end)
+            if match is None:
+                continue
+            izv = match.groupdict()
+            if self.izv_watermark is None:
+                self.izv_watermark = izv_signature(izv)
+            if signature is not None and izv_signature(izv) == signature:
+                break
+            if since is not None and _date_key(izv['pub_date']) <= since:
+                break
+            self._extract_notice(izv)
+            notices.append(izv)
+        # notices -- от последнего на странице; сортировка устойчива
+        return sorted(notices, key=lambda izv: _date_key(izv['pub_date']), reverse=True)
+
+
+class FIPSDocPatentDesignParser(FIPSDocPatentBaseParser):
+
+    doc_type = 'design'
+
+    patterns = {
+        'reg_date': r"<p>(?:\(\d{2}\))?\s*Дата регистрации:[\s\n\t]*(?:<br>)?[\s\n\t]*<b>(\d{2}\.\d{2}\.\d{4})</b>",
+        'app_date': r"\(22\)\s*Дата подачи заявки:\s*<b>(\d{2}\.\d{2}\.\d{4})</b>",
+        'title': r"\(54\)\s*<b>(.+)?</b>",
+        'app_number': r"\(21\)\s*Номер заявки:\s*<b>(?:<a.+>)?(\d+)(?:</a>)?</b>",
+        'start_date': r"\(24\)\s*Дата.+действия патента\:\s*<b>(\d{2}\.\d{2}\.\d{4})</b>",
+        'holders': r"\(73\)\s*Патентообладател.{1,6}\:\s*<b>\s*(?:<br>)?(.+)\s*</b>",  #\s*<b>\s*(?:<br>)?(.+)</b>",
+        'holders_tail': r",?<br>$",
+        'authors': r"\(72\)\s*Автор(?:\(ы\))?\:\s*<b>\s*(?:<br>)?(.+)</b>",
+        'status': r"<td id=\"StatusR\">(.+?)(\(|\n|<br)",
+        'izv_pc4l_holder': (r"\(73\) Патентообладател[^\:]+\:\s*"
+                            r"(?:<br><b>|<b><br>)(.+?)</b>", re.IGNORECASE),
+        'izv_pd4l_holder': (r"\(73\) Патентообладател.+\:\s*"
+                            r"(?:<br><b>|<b><br>)(.+?)</b>", re.IGNORECASE),
+    }
+
+    anchors = {
+        'reg_date': ("Дата регистрации:", None),
+        'app_date': ("(22)", 0),
+        'title': ("(54)", 0),
+        'app_number': ("(21)", 0),
+        'start_date': ("действия патента:", None),
+        'holders': ("(73)", 0),
+        'authors': ("(72)", 0),
+        'status': ("<td id=\"StatusR\">", 0),
+    }
+
+    izv_extractors = {
+        'PC4L': {'holder': ('izv_pc4l_holder',)},
+        'PD4L': {'holder': ('izv_pd4l_holder',)},
+    }
 
     def find_reg_date(self):
         """Дата регистрации."""
 
-        data = re.search(r"<p>(?:\(\d{2}\))?\s*Дата регистрации:[\s\n\t]*(?:<br>)?[\s\n\t]*<b>(\d{2}\.\d{2}\.\d{4})</b>",
-                         self.html_data)
+        data = self._search('reg_date')
         self.parsed['reg_date'] = data.group(1) if data is not None else ''
 
     def find_app_date(self):
         """Данные заявки на выдачу патента."""
 
-        data = re.search(r"\(22\)\s*Дата подачи заявки:\s*<b>(\d{2}\.\d{2}\.\d{4})</b>",
-                         self.html_data)
+        data = self._search('app_date')
         self.parsed['app_date'] = data.group(1) if data is not None else ''
 
     def find_title(self):
         """Название патента"""
-        data = re.search(r"\(54\)\s*<b>(.+)?</b>",
-                         self.html_data)
+        data = self._search('title')
         self.parsed['title'] = data.group(1) if data is not None else ''
 
     def find_app_number(self):
         """Данные заявки на выдачу патента."""
 
-        data = re.search(r"\(21\)\s*Номер заявки:\s*<b>(?:<a.+>)?(\d+)(?:</a>)?</b>",
-                         self.html_data)
+        data = self._search('app_number')
         self.parsed['app_number'] = data.group(1) if data is not None else ''
 
     def find_start_date(self):
         """Сведения об авторах."""
 
-        data = re.search(r"\(24\)\s*Дата.+действия патента\:\s*<b>(\d{2}\.\d{2}\.\d{4})</b>",
-                         self.html_data)
+        data = self._search('start_date')
         self.parsed['start_date'] = data.group(1) if data is not None else ''
 
     def find_holders(self):
         """Сведения о правообладателях."""
 
-        data = re.search(r"\(73\)\s*Патентообладател.{1,6}\:\s*<b>\s*(?:<br>)?(.+)\s*</b>",  #\s*<b>\s*(?:<br>)?(.+)</b>",
-                         self.html_data)
+        data = self._search('holders')
         self.parsed['holders'] = data.group(1) if data is not None else ''
-        self.parsed['holders'] = re.sub(r",?<br>$", "", self.parsed['holders'])
+        self.parsed['holders'] = self.compiled_patterns['holders_tail'].sub("", self.parsed['holders'])
 
     def find_authors(self):
         """Сведения об авторах."""
 
-        data = re.search(r"\(72\)\s*Автор(?:\(ы\))?\:\s*<b>\s*(?:<br>)?(.+)</b>",
-                         self.html_data)
+        data = self._search('authors')
         self.parsed['authors'] = data.group(1) if data is not None else ''
 
     def find_status(self):
         """Статус патента."""
 
-        status = re.search(r"<td id=\"StatusR\">(.+?)(\(|\n|<br)", self.html_data)
+        status = self._search('status')
         self.parsed['status'] = status.group(1) if status is not None else ''
 
-    def find_izv(self):
-        """Извещения об изменениях в патенте."""
-
-        r = re.compile(r"<p class=\"NameIzv\">"
-                       r"(?P<full_name>(?:(?P<code>[A-Z\d]{4}?) (?:\- )?)?(?P<name>.+?))</p>"
-                       r"(<p class=\"izv2\"></p>)?"
-                       r"(?P<text>.+?)"  # текст извещения до даты внесения записи в Госреестр
-                       r"<p class=\"izv\">(?:Дата публикации|Извещение опубликовано|Дата публикации и номер бюллетеня): <b>.*?"
-                       r"(?P<pub_date>\d{2}\.\d{2}\.\d{4}?)</[a-z]>",
-                       flags=re.IGNORECASE)
-        # Оставляем извещения, связанные с изменением данных о правообладателях и авторах
-        codes = 'PC4L PD4L PD4A PC4A TK4A TC4A'.split()
-        self.parsed['izv'] = [x for x in [m.groupdict() for m in r.finditer(self.html_data_min)] if x['code'] in codes]
-        self.extract_izv()
-
-    def extract_izv(self):
-        """Извлечение имён новых авторов и/или патентообладателей."""
-
-        for i, izv in enumerate(self.parsed['izv']):
-
-            if izv['code'] == 'PC4L':
-                data = re.search(r"\(73\) Патентообладател[^\:]+\:\s*"
-                                 r"(?:<br><b>|<b><br>)(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-
-            if izv['code'] == 'PD4L':
-                data = re.search(r"\(73\) Патентообладател.+\:\s*"
-                                 r"(?:<br><b>|<b><br>)(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-
-            if izv['code'] == 'TK4A':
-                data = re.search(r"<p class=\"izv\">Следует читать.+?"
-                                 r"\(73\) Патентообладатель\(и\):\s*"
-                                 r"<br>(?:<b>)?(.+?)(?:</ru-[a-z\d]+>|</b>|<br>)",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-                # проверка авторов -- соотвтствие шаблону 1
-                data = re.search(r"<p class=\"izv\">Следует читать.+?"
-                                 r"\(72\) Автор\(ы\):\s*"
-                                 r"<br>(?:<b>)?(.+?)(?:</b>|<br>)",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['authors'] = data.group(1) if data is not None else ''
-                # проверка авторов -- соответствие шаблону 2
-                if self.parsed['izv'][i]['authors'] == '':
-                    # пример:
-                    # <p class="izv">Следует читать: <b><ru-b906i>(72) иванов, Петров, Сидоров</ru-b906i></b></p>
-                    data = re.search(r"<p class=\"izv\">Следует читать.+?"
-                                     r"(?:<b>)?(?:<ru\-[\da-z]+>)?"
-                                     r"\(72\)\s*(?:<b>)?(.+?)(?:</ru\-[\da-z]+>)?(?:</b>|<br>|</p>)",
-                                     izv['text'],
-                                     flags=re.IGNORECASE)
-                    self.parsed['izv'][i]['authors'] = data.group(1) if data is not None else ''
-
-            if izv['code'] == 'TC4A':
-                data = re.search(r"\(72\) Автор\(ы\):\s*"
-                                 r"<br><b>(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['authors'] = data.group(1) if data is not None else ''
-
-            if izv['code'] == 'PD4A':
-                data = re.search(r"\(73\) (?:Нов[а-яё]{2}\s+)?(?:\s*наименование\s+)?Патентообладател[ь|я](?:\(и\))?:<br><b>(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-
-            if izv['code'] == 'PC4A':
-                data = re.search(r"\(73\) (?:Новый\s+)?Патентообладатель(?:\(и\))?:<br><b>(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
 
-        self.parsed['izv'] = sorted(self.parsed['izv'], key=itemgetter('pub_date'), reverse=True)
+class FIPSDocPatentParser(FIPSDocPatentBaseParser):
 
+    doc_type = 'patent'
 
-class FIPSDocPatentParser(FIPSDocParser):
+    patterns = {
+        'status': r"<td id=\"StatusR\">(.+?)(\(|\n|<br)",
+        'app_data': r"\(21\)\s*\(22\)\s*Заявка:\s*<b><a\s.+\">(.+?)</a>,?[\s\n\t]*(.+?)</b>",
+        'pub_date': (r"<p>(?:\(45\))?\s*Опубликовано:\s*(?:<br>)?[\s\n\t]*<b>(?:<a title=\WОфициальная "
+                     r"публикация.+?target=\"_blank\">)?([\d\.]{10}?)(?:</a>)?"),
+        'authors': r"<p>\(72\) Автор\(ы\):<b>[\s\n\t]*(?:<br>)?(.+?)</b>",
+        'authors_izv': r"<p class=\"izv\">\(72\) Автор\(ы\):<br>[\s\n\t]*<b>(.+?)</b>",
+        'holders': r"<p>\(73\) Патентообладатель\(и\):<b>[\s\n\t]*(?:<br>)?(.+?)</b>",
+        # <p id="B542">(54) <b>ВОЗБУДИТЕЛЬ ВОЛНЫ ТЕ<sub>01</sub>
+        # </b>
+        'title': r"\(54\)\s+<b>(.+?)(:?</b>|\n)",
+        'prior_app': (r"<p class=\"prior\">Приоритет\(ы\):</p>[\s\n\t]*<p>[\s\n\t]*\(22\) Дата подачи заявки: "
+                      r"<b>(.+?)</b>"),
+        'prior_conv': (r"<p class=\"prior\">Приоритет\(ы\):</p>[\s\n\t]*<p>[\s\n\t]*\(30\) Конвенционный "
+                       r"приоритет:(?:.*?)?<br>(.+?)</b>"),
+        'start_date': r"\(24\) Дата начала отсчета срока действия патента:\s*<br>\n<b>(.+?)<\/b>",
+    }
+
+    anchors = {
+        'status': ("<td id=\"StatusR\">", 0),
+        'app_data': ("(21)", 0),
+        'pub_date': ("Опубликовано:", None),
+        'authors': ("<p>(72) Автор(ы):<b>", 0),
+        'authors_izv': ("<p class=\"izv\">(72) Автор(ы):<br>", 0),
+        'holders': ("<p>(73) Патентообладатель(и):<b>", 0),
+        'title': ("(54)", 0),
+        'start_date': ("(24) Дата начала отсчета срока действия патента:", 0),
+        'prior_app': ("(22) Дата подачи заявки: <b>", None),
+        'prior_conv': ("(30) Конвенционный приоритет:", None),
+    }
+
+    method_fields = {
+        'find_app_data': ('app_number', 'app_date'),
+        'find_authors': ('authors', 'authors_izv'),
+    }
+
+    izv_extractors = {
+        'PD1K': {'holder': ('izv_pd4a_holder',)},
+        'PD9K': {'holder': ('izv_pc4a_holder',)},
+        'PC9K': {'holder': ('izv_pc4a_holder',)},
+        'PC1K': {'holder': ('izv_pc4a_holder',)},
+    }
 
     def find_status(self):
         """Статус патента."""
 
-        status = re.search(r"<td id=\"StatusR\">(.+?)(\(|\n|<br)", self.html_data)
+        status = self._search('status')
         self.parsed['status'] = status.group(1) if status is not None else ''
 
     def find_app_data(self):
         """Данные заявки на выдачу патента."""
 
-        app_data = re.search(
-            r"\(21\)\s*\(22\)\s*Заявка:\s*<b><a\s.+\">(.+?)</a>,?[\s\n\t]*(.+?)</b>",
-            self.html_data)
+        app_data = self._search('app_data')
         self.parsed['app_number'] = app_data.group(1) if app_data is not None else ''
         self.parsed['app_date'] = app_data.group(2) if app_data is not None else ''
 
     def find_pub_date(self):
         """Дата публикации."""
 
-        data = re.search(
-            r"<p>(?:\(45\))?\s*Опубликовано:\s*(?:<br>)?[\s\n\t]*<b>(?:<a title=\WОфициальная "
-            r"публикация.+?target=\"_blank\">)?([\d\.]{10}?)(?:</a>)?",
-            self.html_data)
+        data = self._search('pub_date')
         self.parsed['pub_date'] = data.group(1) if data is not None else ''
 
     def find_authors(self):
         """Авторы изобретения/полезной модели."""
 
-        data = re.search(r"<p>\(72\) Автор\(ы\):<b>[\s\n\t]*(?:<br>)?(.+?)</b>", self.html_data)
+        data = self._search('authors')
         self.parsed['authors'] = data.group(1) if data is not None else ''
         '''
         <p class="izv">(72) Автор(ы):<br>
         <b>Дубин Дмитрий Андреевич (RU),<br>Вдовин Денис Сергеевич (RU),<br>Ципилев Александр Анатольевич (RU),<br>Дьяков Алексей Сергеевич (RU),<br>Евсеев Кирилл Борисович (RU),<br>Чутков Константин Александрович (RU),<br>Шарабанова Анна Андреевна (RU)</b>
         </p>
         '''
-        data = re.search(r"<p class=\"izv\">\(72\) Автор\(ы\):<br>[\s\n\t]*<b>(.+?)</b>", self.html_data)
+        data = self._search('authors_izv')
         if data is not None:
             self.parsed['authors_izv'] = []
             for gr in data.groups():
@@ -247,205 +1195,283 @@ class FIPSDocPatentParser(FIPSDocParser):
     def find_holders(self):
         """Патентообладатели."""
 
-        data = re.search(r"<p>\(73\) Патентообладатель\(и\):<b>[\s\n\t]*(?:<br>)?(.+?)</b>", self.html_data)
+        data = self._search('holders')
         self.parsed['holders'] = data.group(1) if data is not None else ''
 
     def find_title(self):
         """Название изобретения/полезной модели."""
-        
-        # <p id="B542">(54) <b>ВОЗБУДИТЕЛЬ ВОЛНЫ ТЕ<sub>01</sub>
-        # </b>
 
-        data = re.search(r"\(54\)\s+<b>(.+?)(:?</b>|\n)", self.html_data)
+        data = self._search('title')
         self.parsed['title'] = data.group(1) if data is not None else ''
 
     def find_prior_app(self):
         """Приоритет (дата подачи заявки)."""
 
-        data = re.search(
-            r"<p class=\"prior\">Приоритет\(ы\):</p>[\s\n\t]*<p>[\s\n\t]*\(22\) Дата подачи заявки: <b>(.+?)</b>",
-            self.html_data)
+        data = self._search('prior_app')
         self.parsed['prior_app'] = data.group(1) if data is not None else ''
 
     def find_prior_conv(self):
         """Конвенционный приоритет."""
 
-        data = re.search(r"<p class=\"prior\">Приоритет\(ы\):</p>[\s\n\t]*<p>[\s\n\t]*\(30\) Конвенционный "
-                         r"приоритет:(?:.*?)?<br>(.+?)</b>",
-                         self.html_data)
+        data = self._search('prior_conv')
         self.parsed['prior_conv'] = data.group(1) if data is not None else ''
 
     def find_start_date(self):
         """Дата начала срока действия патента."""
 
-        data = re.search(r"\(24\) Дата начала отсчета срока действия патента:\s*<br>\n<b>(.+?)<\/b>",
-                         self.html_data)
+        data = self._search('start_date')
         self.parsed['start_date'] = data.group(1) if data is not None else ''
 
-    def find_izv(self):
-        """Извещения об изменениях в патенте."""
-
-        r = re.compile(r"<p class=\"NameIzv\">"
-                       r"(?P<full_name>(?:(?P<code>[A-Z\d]{4}?) (?:\- )?)?(?P<name>.+?))</p>"
-                       r"(<p class=\"izv2\"></p>)?"
-                       r"(?P<text>.+?)"  # текст извещения до даты внесения записи в Госреестр
-                       r"<p class=\"izv\">(?:Дата публикации|Извещение опубликовано|Дата публикации и номер бюллетеня): <b>.*?"
-                       r"(?P<pub_date>\d{2}\.\d{2}\.\d{4}?)</[a-z]>",
-                       flags=re.IGNORECASE)
-        # Оставляем извещения, связанные с изменением данных о правообладателях и авторах
-        codes = 'PD4A PC4A TK4A TC4A PD9K PC9K PD1K PC1K'.split()
-        self.parsed['izv'] = [x for x in [m.groupdict() for m in r.finditer(self.html_data_min)] if x['code'] in codes]
-        self.extract_izv()
-
-    def extract_izv(self):
-        """Извлечение имён новых авторов и/или патентообладателей."""
-
-        for i, izv in enumerate(self.parsed['izv']):
-            if izv['code'] == 'TK4A':
-                data = re.search(r"<p class=\"izv\">Следует читать.+?"
-                                 r"\(73\) Патентообладатель\(и\):\s*"
-                                 r"<br>(?:<b>)?(.+?)(?:</ru-[a-z\d]+>|</b>|<br>)",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-                # проверка авторов -- соотвтствие шаблону 1
-                data = re.search(r"<p class=\"izv\">Следует читать.+?"
-                                 r"\(72\) Автор\(ы\):\s*"
-                                 r"<br>(?:<b>)?(.+?)(?:</b>|<br>)",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['authors'] = data.group(1) if data is not None else ''
-                # проверка авторов -- соответствие шаблону 2
-                if self.parsed['izv'][i]['authors'] == '':
-                    # пример:
-                    # <p class="izv">Следует читать: <b><ru-b906i>(72) иванов, Петров, Сидоров</ru-b906i></b></p>
-                    data = re.search(r"<p class=\"izv\">Следует читать.+?"
-                                     r"(?:<b>)?(?:<ru\-[\da-z]+>)?"
-                                     r"\(72\)\s*(?:<b>)?(.+?)(?:</ru\-[\da-z]+>)?(?:</b>|<br>|</p>)",
-                                     izv['text'],
-                                     flags=re.IGNORECASE)
-                    self.parsed['izv'][i]['authors'] = data.group(1) if data is not None else ''
-
-            if izv['code'] == 'TC4A':
-                data = re.search(r"\(72\) Автор\(ы\):\s*"
-                                 r"<br><b>(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['authors'] = data.group(1) if data is not None else ''
-
-            if izv['code'] in ['PD4A', 'PD1K']:
-                data = re.search(r"\(73\) (?:Нов[а-яё]{2}\s+)?(?:\s*наименование\s+)?Патентообладател[ь|я](?:\(и\))?:<br><b>(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-
-            if izv['code'] in ['PC4A', 'PD9K', 'PC9K', 'PC1K']:
-                data = re.search(r"\(73\) (?:Новый\s+)?Патентообладатель(?:\(и\))?:<br><b>(.+?)</b>",
-                                 izv['text'],
-                                 flags=re.IGNORECASE)
-                self.parsed['izv'][i]['holder'] = data.group(1) if data is not None else ''
-        self.parsed['izv'] = sorted(self.parsed['izv'], key=itemgetter('pub_date'), reverse=True)
-
 
 class FIPSDocEVMDBParser(FIPSDocParser):
 
+    patterns = {
+        'pub_date': r"<p>Дата публикации:[\s\n\t]*<b>(?:<a.+target=\"_blank\">)?(.+?)(?:</a>)?</b>",
+        'app_data': r"<p>Номер и дата поступления заявки:<br>[\s\n\t]*<b>(.+?) (.+?)</b>",
+        'authors': r"<p>[\s\n\t]*Автор(?:ы)?:[\s\n\t]*<br>[\s\n\t]*<b>(.+?)</b>",
+        'holders': r"<p>[\s\n]*Правообладател(?:и|ь):[\s\n]*<br>[\s\n]*<b>(.+?)</b>",
+        'abstract': r"<p class=\"TitAbs\">[\s\n\t]*(?:<b>)?Реферат:(?:</b>)?[\s\n\t]*<br>(.+?)</p>",
+        'holders_izv': (r"<p class=\"izv\">.*?правообладател[ьи](?! \(правопреемник\)).*</p>\n?(?:<p class=\"izv2\">Следует "
+                        r"читать:</p>\n?)?<p class=\"izvValue\">(.+?)</p>", re.IGNORECASE),
+        'authors_izv': (r"<p class=\"izv\">.*?Автор[ы]?.*</p>\n?(?:<p class=\"izv2\">Следует "
+                        r"читать:</p>\n?)?<p class=\"izvValue\">(.+?)</p>", re.IGNORECASE),
+        'title': r"<p class=\"TitAbs\">[\s\n\t]*Название.+:[\s\n\t]*<br>[\s\n\t]*<b>(.+?)</b>",
+        'title_izv': (r"<p class=\"izv\">.*?название (?:базы данных|программы для ).*</p>\n?(?:<p "
+                      r"class=\"izv\d*\">Следует "
+                      r"читать:</p>\n?)?<p class=\"izvValue\">(.+?)</p>", re.IGNORECASE),
+    }
+
+    anchors = {
+        'pub_date': ("<p>Дата публикации:", 0),
+        'app_data': ("<p>Номер и дата поступления заявки:<br>", 0),
+        'authors': ("Автор", None),
+        'holders': ("Правообладател", None),
+        'abstract': ("Реферат:", None),
+        'title': ("Название", None),
+        'holders_izv': ("<p class=\"izv\">", 0),
+        'authors_izv': ("<p class=\"izv\">", 0),
+        'title_izv': ("<p class=\"izv\">", 0),
+    }
+
+    method_fields = {
+        'find_app_data': ('app_number', 'app_date'),
+        'find_holders_new': ('holders_izv',),
+        'find_authors_new': ('authors_izv',),
+        'find_title_new': ('title_izv',),
+    }
+
     def find_pub_date(self):
         """Дата публикации сведений об ОИС."""
 
-        data = re.search(r"<p>Дата публикации:[\s\n\t]*<b>(?:<a.+target=\"_blank\">)?(.+?)(?:</a>)?</b>",
-                         self.html_data)
+        data = self._search('pub_date')
         self.parsed['pub_date'] = data.group(1) if data is not None else ''
 
     def find_app_data(self):
         """Данные заявки на регистрацию ОИС."""
 
-        app_data = re.search(r"<p>Номер и дата поступления заявки:<br>[\s\n\t]*<b>(.+?) (.+?)</b>",
-                             self.html_data)
+        app_data = self._search('app_data')
         self.parsed['app_number'] = app_data.group(1) if app_data is not None else ''
         self.parsed['app_date'] = app_data.group(2) if app_data is not None else ''
 
     def find_authors(self):
         """Авторы ОИС."""
 
-        data = re.search(r"<p>[\s\n\t]*Автор(?:ы)?:[\s\n\t]*<br>[\s\n\t]*<b>(.+?)</b>", self.html_data)
+        data = self._search('authors')
         self.parsed['authors'] = data.group(1) if data is not None else ''
 
     def find_holders(self):
         """Правообладатели ОИС."""
 
-        data = re.search(r"<p>[\s\n]*Правообладател(?:и|ь):[\s\n]*<br>[\s\n]*<b>(.+?)</b>",
-                         self.html_data)
+        data = self._search('holders')
         self.parsed['holders'] = data.group(1) if data is not None else ''
 
     def find_abstract(self):
-        data = re.search(r"<p class=\"TitAbs\">[\s\n\t]*(?:<b>)?Реферат:(?:</b>)?[\s\n\t]*<br>(.+?)</p>",
-                         self.html_data)
+        data = self._search('abstract')
         self.parsed['abstract'] = data.group(1) if data is not None else ''
 
     def find_holders_new(self):
         """Правообладатели, которые указаны в извещениях."""
 
-        data = re.findall(
-            r"<p class=\"izv\">.*?правообладател[ьи](?! \(правопреемник\)).*</p>\n?(?:<p class=\"izv2\">Следует "
-            r"читать:</p>\n?)?<p class=\"izvValue\">(.+?)</p>",
-            self.html_data, flags=re.IGNORECASE)
+        data = self._findall('holders_izv')
 
         self.parsed['holders_izv'] = data
 
     def find_authors_new(self):
         """Авторы, которые указаны в извещениях."""
 
-        data = re.findall(r"<p class=\"izv\">.*?Автор[ы]?.*</p>\n?(?:<p class=\"izv2\">Следует "
-                          r"читать:</p>\n?)?<p class=\"izvValue\">(.+?)</p>",
-                          self.html_data, flags=re.IGNORECASE)
+        data = self._findall('authors_izv')
         self.parsed['authors_izv'] = data
 
     def find_title(self):
         """Название ОИС."""
 
-        data = re.search(r"<p class=\"TitAbs\">[\s\n\t]*Название.+:[\s\n\t]*<br>[\s\n\t]*<b>(.+?)</b>", self.html_data)
+        data = self._search('title')
         self.parsed['title'] = data.group(1) if data is not None else ''
 
     def find_title_new(self):
         """Новые названия ОИС, указанные в извещениях."""
 
-        data = re.findall(r"<p class=\"izv\">.*?название (?:базы данных|программы для ).*</p>\n?(?:<p "
-                          r"class=\"izv\d*\">Следует "
-                          r"читать:</p>\n?)?<p class=\"izvValue\">(.+?)</p>",
-                          self.html_data, flags=re.IGNORECASE)
+        data = self._findall('title_izv')
         self.parsed['title_izv'] = data
 
 
 class FIPSDocEVMParser(FIPSDocEVMDBParser):
     """Парсер свидетельства о регистрации ПрЭВМ."""
 
+    doc_type = 'evm'
+
+    patterns = {
+        'tool': r"<b>Язык программирования:[\n\s]*</b>[\n\s]*(.+?)</p>",
+        'size': r"<b>Объ[её]м программы для ЭВМ:[\n\s]*</b>[\n\s]*(.+?)</p>",
+    }
+
+    anchors = {
+        'tool': ("<b>Язык программирования:", 0),
+        'size': ("<b>Объ", 0),
+    }
+
     def find_tool(self):
-        data = re.search(r"<b>Язык программирования:[\n\s]*</b>[\n\s]*(.+?)</p>", self.html_data)
+        data = self._search('tool')
         self.parsed['tool'] = data.group(1) if data is not None else ''
 
     def find_size(self):
-        data = re.search(r"<b>Объ[её]м программы для ЭВМ:[\n\s]*</b>[\n\s]*(.+?)</p>",
-                         self.html_data)
+        data = self._search('size')
         self.parsed['size'] = data.group(1) if data is not None else ''
 
 
 class FIPSDocDBParser(FIPSDocEVMDBParser):
     """Парсер свидетельства о регистрации БД."""
 
+    doc_type = 'db'
+
+    patterns = {
+        'tool': r"<b>Вид и версия системы управления базой данных:[\n\s]*</b>[\n\s]*(.+?)</p>",
+        'size': r"<b>Объ[её]м базы данных:[\n\s]*</b>[\n\s]*(.+?)</p>",
+    }
+
+    anchors = {
+        'tool': ("<b>Вид и версия системы управления базой данных:", 0),
+        'size': ("<b>Объ", 0),
+    }
+
     def find_tool(self):
-        data = re.search(r"<b>Вид и версия системы управления базой данных:[\n\s]*</b>[\n\s]*(.+?)</p>",
-                         self.html_data)
+        data = self._search('tool')
 
         self.parsed['tool'] = data.group(1) if data is not None else ''
 
     def find_size(self):
-        data = re.search(r"<b>Объ[её]м базы данных:[\n\s]*</b>[\n\s]*(.+?)</p>",
-                         self.html_data)
+        data = self._search('size')
         self.parsed['size'] = data.group(1) if data is not None else ''
 
 
 class FIPSDocTIMSParser(FIPSDocEVMDBParser):
     """Парсер свидетельства о регистрации ТИМС."""
 
-    pass
-
+    doc_type = 'tims'
+
+
+# Классы парсеров по видам документов
+PARSERS = {
+    'patent': FIPSDocPatentParser,
+    'design': FIPSDocPatentDesignParser,
+    'evm': FIPSDocEVMParser,
+    'db': FIPSDocDBParser,
+    'tims': FIPSDocTIMSParser,
+}
+
+# Реестры ФИПС (параметр DB ссылки на документ) и соответствующие им виды документов
+REGISTRIES = {
+    'RUPAT': 'patent',
+    'RUPM': 'patent',
+    'RUDE': 'design',
+    'EVM': 'evm',
+    'DB': 'db',
+    'TIMS': 'tims',
+}
+
+# Размер начального фрагмента страницы, по которому определяется вид документа
+SNIFF_LIMIT = 1 << 15
+
+_REGISTRY_LINK = re.compile(r"(?<=[?&])DB=([A-Z]+)&(?:amp;)?DocNumber=")
+_REGISTRY_LINK_BYTES = re.compile(_REGISTRY_LINK.pattern.encode('ascii'))
+_MISSING_BYTES = [re.compile(rb"\s+".join(re.escape(word.encode(encoding))
+                                          for word in "Документ с данным номером отсутствует".split()))
+                  for encoding in ENCODINGS]
+
+
+def detect_document_type(data, limit=SNIFF_LIMIT):
+    """
+    Определяет вид документа по первым limit знакам (байтам) страницы, не декодируя
+    и не очищая её целиком. data -- str или bytes.
+
+    Возвращает ключ PARSERS ('patent' -- изобретение или полезная модель, 'design', 'evm', 'db', 'tims'),
+    'missing' для заглушки отсутствующего в реестре документа или None,
+    если вид не определён (например, документ другого реестра).
+    """
+
+    head = data[:limit]
+    if isinstance(head, str):
+        links = (link.group(1) for link in _REGISTRY_LINK.finditer(head))
+        missing = [FIPSDocParser.compiled_patterns['missing']]
+    else:
+        head = bytes(head)
+        links = (link.group(1).decode('ascii') for link in _REGISTRY_LINK_BYTES.finditer(head))
+        missing = _MISSING_BYTES
+    # ссылки на реестры заявок (RUPATAP и т.п.) пропускаются
+    for registry in links:
+        if registry in REGISTRIES:
+            return REGISTRIES[registry]
+    if any(pattern.search(head) is not None for pattern in missing):
+        return 'missing'
+    return None
+
+
+def _parser_class(detected, doc_type):
+    if detected == 'missing':
+        raise DocumentNotExistsInOpenRegistry()
+    # если вид не удалось определить, используется указанный вызывающим
+    if detected is None:
+        detected = doc_type
+    if detected not in PARSERS or (doc_type is not None and doc_type != detected):
+        raise UnknownDocumentType(doc_type, detected)
+    return PARSERS[detected]
+
+
+def _instance(parser_class, parsers):
+    if parsers is None:
+        return parser_class()
+    parser = parsers.get(parser_class)
+    if parser is None:
+        parser = parsers[parser_class] = parser_class()
+    return parser
+
+
+def create_parser(data, doc_type=None, encoding=None, parsers=None):
+    """
+    Создаёт парсер нужного вида (detect_document_type) и передаёт в него страницу data (str или bytes).
+
+    Заглушки отсутствующих документов отклоняются исключением DocumentNotExistsInOpenRegistry,
+    страницы неизвестного вида или вида, отличного от doc_type, -- исключением UnknownDocumentType,
+    до декодирования и очистки всей страницы.
+
+    parsers -- словарь {класс парсера: экземпляр} для повторного использования экземпляров
+    (например, по одному на поток): вместо создания нового парсера страница передаётся в имеющийся,
+    недостающие экземпляры создаются и добавляются в словарь.
+    """
+
+    parser = _instance(_parser_class(detect_document_type(data), doc_type), parsers)
+    if isinstance(data, str):
+        parser.html_data = data
+    else:
+        parser.feed_bytes(data, encoding)
+    return parser
+
+
+def create_file_parser(path, doc_type=None, encoding=None, parsers=None):
+    """То же, что create_parser, для сохранённой страницы: вид определяется по началу файла."""
+
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_LIMIT)
+    parser = _instance(_parser_class(detect_document_type(head), doc_type), parsers)
+    parser.feed_file(path, encoding)
+    return parser
@@ -0,0 +1,182 @@
+"""
+Пакетный разбор документов Открытых реестров ФИПС в пуле процессов.
+"""
+
+import glob
+import multiprocessing
+import os
+import threading
+
+from .FIPSDocParser import (DocumentNotExistsInOpenRegistry, PartyDictionary, UnknownDocumentType,
+                            create_file_parser, create_parser, structure_parsed)
+
+# экземпляры парсеров, повторно используемые для документов пакета (по одному набору на поток)
+_local = threading.local()
+
+
+def _parsers():
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    return parsers
+
+
+class ParseResult:
+    """
+    Результат разбора одного документа пакета.
+
+    index -- порядковый номер документа во входной последовательности;
+    source -- путь к файлу (для parse_files) или None;
+    doc_type -- вид документа (ключ PARSERS; определённый по странице, если не был указан);
+    parsed -- словарь извлечённых данных (None, если документ не разобран);
+    missing -- True, если документ отсутствует в Открытом реестре;
+    error -- текст ошибки разбора или None;
+    overrun -- поля, разбор которых превысил бюджет времени (их значения пустые, см. FIPSDocParser.parse).
+    """
+
+    __slots__ = ('index', 'source', 'doc_type', 'parsed', 'missing', 'error', 'overrun')
+
+    def __init__(self, index, source, doc_type, parsed=None, missing=False, error=None, overrun=()):
+        self.index = index
+        self.source = source
+        self.doc_type = doc_type
+        self.parsed = parsed
+        self.missing = missing
+        self.error = error
+        self.overrun = overrun
+
+    def __repr__(self):
+        return "ParseResult(index=%r, source=%r, doc_type=%r, missing=%r, error=%r, overrun=%r)" % (
+            self.index, self.source, self.doc_type, self.missing, self.error, self.overrun)
+
+    @property
+    def ok(self):
+        return self.parsed is not None
+
+
+def parse_document(index, doc_type, html=None, source=None, engine=None, fields=None, cache=None, structured=False,
+                   budget=None):
+    """
+    Разбирает один документ и возвращает ParseResult.
+    Исключения не выбрасываются: отсутствие документа в реестре и ошибки
+    разбора отражаются в полях missing и error результата.
+
+    Если вид документа doc_type не указан, он определяется по странице (detect_document_type).
+    cache -- кэш результатов разбора (cache.ParseCache) или None;
+    structured -- разбить списки правообладателей и авторов на записи Party (structure_parsed);
+    budget -- бюджет времени одного метода find_ в секундах (см. FIPSDocParser.parse).
+    """
+
+    result = ParseResult(index, source, doc_type)
+    try:
+        if cache is not None:
+            if html is None:
+                result.doc_type, parsed, overrun = cache._parse_file(source, doc_type, None, engine, fields, budget)
+            else:
+                result.doc_type, parsed, overrun = cache._parse(html, doc_type, None, engine, fields, budget)
+        else:
+            if html is None:
+                parser = create_file_parser(source, doc_type, parsers=_parsers())
+            else:
+                parser = create_parser(html, doc_type, parsers=_parsers())
+            result.doc_type = parser.doc_type
+            parser.parse(engine, fields, budget=budget)
+            parsed, overrun = parser.parsed, parser.overrun
+            parser.reset()
+        result.overrun = tuple(overrun)
+        result.parsed = structure_parsed(parsed) if structured else parsed
+    except DocumentNotExistsInOpenRegistry:
+        result.missing = True
+    except UnknownDocumentType as e:
+        result.error = "Неизвестный вид документа: ожидался %r, определён %r" % e.args
+    except Exception as e:
+        result.error = "%s: %s" % (type(e).__name__, e)
+    return result
+
+
+def _parse_task(task):
+    return parse_document(*task)
+
+
+def _results(tasks, processes, chunksize, ordered):
+    if processes == 0:
+        for task in tasks:
+            yield _parse_task(task)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        if ordered:
+            yield from pool.imap(_parse_task, tasks, chunksize)
+        else:
+            yield from pool.imap_unordered(_parse_task, tasks, chunksize)
+
+
+def _run(tasks, processes, chunksize, ordered, parties=None):
+    # записи Party, полученные из процессов пула, объединяются словарём текущего процесса
+    for result in _results(tasks, processes, chunksize, ordered):
+        if parties is not None and result.parsed is not None:
+            structure_parsed(result.parsed, parties)
+        yield result
+
+
+def _parties(structured, parties):
+    if structured and parties is None:
+        return PartyDictionary()
+    return parties if structured else None
+
+
+def parse_many(items, processes=None, chunksize=16, ordered=True, engine=None, fields=None, cache=None,
+               structured=False, parties=None, budget=None):
+    """
+    Разбирает последовательность пар (вид документа, HTML-код) в пуле процессов.
+    Вид документа может быть None -- тогда он определяется по странице.
+
+    processes -- число процессов (None -- по числу процессоров, 0 -- без пула, в текущем процессе);
+    chunksize -- число документов, передаваемых процессу за раз;
+    ordered -- выдавать результаты в порядке входной последовательности (иначе -- по мере готовности);
+    engine -- движок извлечения, fields -- список нужных полей (см. FIPSDocParser.parse);
+    cache -- кэш результатов разбора (cache.ParseCache): с базой SQLite он общий для всех процессов пула;
+    structured -- разбить списки правообладателей и авторов на записи Party (см. FIPSDocParser.parse);
+    parties -- словарь PartyDictionary, объединяющий одинаковые записи всех документов
+    (при structured=True по умолчанию создаётся новый словарь);
+    budget -- бюджет времени одного метода find_ в секундах: поля, превысившие его, остаются пустыми
+    и перечисляются в ParseResult.overrun, а процесс пула не задерживается на одной странице.
+
+    Возвращает генератор объектов ParseResult.
+    """
+
+    tasks = ((index, doc_type, html, None, engine, fields, cache, structured, budget)
+             for index, (doc_type, html) in enumerate(items))
+    return _run(tasks, processes, chunksize, ordered, _parties(structured, parties))
+
+
+def iter_paths(source, extensions=('.html', '.htm')):
+    """
+    Пути к сохранённым страницам: source -- каталог (обходится рекурсивно),
+    шаблон glob или последовательность путей.
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            for directory, dirnames, filenames in os.walk(source):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(extensions):
+                        yield os.path.join(directory, filename)
+        else:
+            yield from sorted(glob.glob(source, recursive=True))
+    else:
+        yield from source
+
+
+def parse_files(source, doc_type=None, processes=None, chunksize=16, ordered=True, engine=None, fields=None,
+                cache=None, structured=False, parties=None, budget=None):
+    """
+    Разбирает сохранённые страницы (см. iter_paths и parse_many); doc_type=None -- вид
+    каждого документа определяется по странице.
+    Файлы читаются в процессах пула (FIPSDocParser.feed_file).
+    """
+
+    tasks = ((index, doc_type, None, path, engine, fields, cache, structured, budget)
+             for index, path in enumerate(iter_paths(source)))
+    return _run(tasks, processes, chunksize, ordered, _parties(structured, parties))
@@ -0,0 +1,195 @@
+"""
+Кэш результатов разбора документов Открытых реестров ФИПС.
+
+Ключ записи -- хэш исходной страницы, класс парсера и отпечаток его шаблонов и методов
+(FIPSDocParser.pattern_version), поэтому после исправления шаблона или метода find_
+прежние записи не используются и документ разбирается заново.
+Записи хранятся в памяти процесса (LRU ограниченного размера) и, если указан путь,
+в базе SQLite, общей для процессов пула (см. batch.parse_many).
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from .FIPSDocParser import (MMAP_THRESHOLD, PARSERS, DocumentNotExistsInOpenRegistry, _parser_class,
+                            detect_document_type)
+
+_SCHEMA = ("CREATE TABLE IF NOT EXISTS parsed ("
+           "key TEXT PRIMARY KEY, parser TEXT NOT NULL, version TEXT NOT NULL, missing INTEGER NOT NULL, data TEXT)")
+
+# кэши процесса, созданные open_cache
+_shared = {}
+
+
+def _class_name(parser_class):
+    return "%s.%s" % (parser_class.__module__, parser_class.__qualname__)
+
+
+def open_cache(path=None, maxsize=1024):
+    """
+    Кэш текущего процесса: повторные вызовы с теми же аргументами возвращают один и тот же объект.
+    Так восстанавливается ParseCache, переданный в процессы пула.
+    """
+
+    key = (os.path.abspath(path) if path is not None else None, maxsize)
+    cache = _shared.get(key)
+    if cache is None:
+        cache = _shared[key] = ParseCache(maxsize, path)
+    return cache
+
+
+class ParseCache:
+    """
+    Кэш результатов разбора.
+
+    maxsize -- наибольшее число записей в памяти процесса (вытесняются давно не использованные);
+    path -- путь к базе SQLite (создаётся при первом обращении) или None -- только память.
+
+    Словари parsed хранятся сериализованными в JSON: каждый вызов parse возвращает новый словарь.
+    """
+
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.__memory = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__connection = None
+        self.__pid = None
+
+    def __reduce__(self):
+        # в процессе пула используется один объект на процесс, а не копия на каждый документ
+        return open_cache, (self.path, self.maxsize)
+
+    def __connect(self):
+        # соединение SQLite не наследуется процессами пула: каждый процесс открывает своё
+        if self.__pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # в режиме WAL не нарушает целостность базы при сбое, но не синхронизирует каждую запись
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self.__connection, self.__pid = connection, os.getpid()
+        return self.__connection
+
+    @staticmethod
+    def key(parser_class, data, encoding=None, fields=None):
+        """Ключ записи для страницы data (str или bytes), разбираемой парсером parser_class."""
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(data.encode('utf-8') if isinstance(data, str) else data)
+        digest.update(repr((_class_name(parser_class), parser_class.pattern_version, encoding,
+                            None if fields is None else sorted(fields))).encode('utf-8'))
+        return digest.hexdigest()
+
+    def __remember(self, key, value):
+        self.__memory[key] = value
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.maxsize:
+            self.__memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Словарь parsed записи key или None, если записи нет. Для документа,
+        отсутствующего в реестре, выбрасывается исключение DocumentNotExistsInOpenRegistry.
+        """
+
+        with self.__lock:
+            if key in self.__memory:
+                self.__memory.move_to_end(key)
+                value = self.__memory[key]
+            elif self.path is not None:
+                row = self.__connect().execute("SELECT missing, data FROM parsed WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                value = None if row[0] else row[1]
+                self.__remember(key, value)
+            else:
+                return None
+        if value is None:
+            raise DocumentNotExistsInOpenRegistry()
+        return json.loads(value)
+
+    def put(self, key, parser_class, parsed):
+        """Сохраняет словарь parsed (None -- документ отсутствует в реестре)."""
+
+        value = None if parsed is None else json.dumps(parsed, ensure_ascii=False)
+        with self.__lock:
+            self.__remember(key, value)
+            if self.path is not None:
+                self.__connect().execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?)",
+                                         (key, _class_name(parser_class), parser_class.pattern_version,
+                                          int(parsed is None), value))
+
+    def parse(self, data, doc_type=None, encoding=None, engine=None, fields=None, budget=None):
+        """
+        Разбирает страницу data (str или bytes), как create_parser(data, doc_type, encoding).parse(engine, fields,
+        budget=budget), если результата ещё нет в кэше. Возвращает пару (вид документа, словарь parsed).
+        Результат, в котором какое-либо поле превысило бюджет времени (FIPSDocParser.overrun), не сохраняется.
+        """
+
+        return self._parse(data, doc_type, encoding, engine, fields, budget)[:2]
+
+    def _parse(self, data, doc_type, encoding, engine, fields, budget):
+        # то же, что parse, с третьим элементом -- списком полей, превысивших бюджет
+        parser_class = _parser_class(detect_document_type(data), doc_type)
+        kind = parser_class.doc_type
+        key = self.key(parser_class, data, encoding, fields)
+        parsed = self.get(key)
+        if parsed is not None:
+            self.hits += 1
+            return kind, parsed, []
+        self.misses += 1
+        parser = parser_class()
+        try:
+            if isinstance(data, str):
+                parser.html_data = data
+            else:
+                parser.feed_bytes(data, encoding)
+        except DocumentNotExistsInOpenRegistry:
+            self.put(key, parser_class, None)
+            raise
+        parser.parse(engine, fields, budget=budget)
+        if not parser.overrun:
+            self.put(key, parser_class, parser.parsed)
+        return kind, parser.parsed, parser.overrun
+
+    def parse_file(self, path, doc_type=None, encoding=None, engine=None, fields=None, budget=None):
+        """То же, что parse, для сохранённой страницы (крупные файлы читаются через отображение в память)."""
+
+        return self._parse_file(path, doc_type, encoding, engine, fields, budget)[:2]
+
+    def _parse_file(self, path, doc_type, encoding, engine, fields, budget):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return self._parse(buf, doc_type, encoding, engine, fields, budget)
+            return self._parse(f.read(), doc_type, encoding, engine, fields, budget)
+
+    def purge(self):
+        """
+        Удаляет из базы записи, сделанные прежними версиями парсеров (pattern_version
+        отличается от текущей). Возвращает число удалённых записей.
+        """
+
+        if self.path is None:
+            return 0
+        current = [(_class_name(parser_class), parser_class.pattern_version) for parser_class in PARSERS.values()]
+        with self.__lock:
+            return self.__connect().execute("DELETE FROM parsed WHERE (parser || ' ' || version) NOT IN (%s)"
+                                            % ", ".join("?" * len(current)),
+                                            ["%s %s" % item for item in current]).rowcount
+
+    def clear(self):
+        """Удаляет все записи из памяти и из базы."""
+
+        with self.__lock:
+            self.__memory.clear()
+            if self.path is not None:
+                self.__connect().execute("DELETE FROM parsed")
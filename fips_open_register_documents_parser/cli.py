@@ -0,0 +1,249 @@
+"""
+Пакетный разбор сохранённых страниц из командной строки:
+
+    python -m fips_open_register_documents_parser pages/ -o out/ -j 8
+    python -m fips_open_register_documents_parser pages.tar.gz -o out/ --format parquet --shard 0/4
+    python -m fips_open_register_documents_parser pages.jsonl -o out/ --type evm --resume
+
+Источник -- каталог (обходится рекурсивно), архив tar (в том числе сжатый) или файл JSONL,
+каждая строка которого -- объект {"html": страница, "doc_type": вид документа, "source": имя},
+поля doc_type и source необязательны. Вид документа без --type определяется по странице.
+
+Страницы разбираются частями по --part-size документов; каждая часть записывается в каталог
+вывода отдельным файлом (jsonl: part-00001.jsonl, одна строка на документ) или каталогом
+(parquet, arrow, csv: part-00001/, см. export.ExportSink). Записанные части отмечаются в файле
+_checkpoint.jsonl: с --resume прерванный запуск продолжается со следующей части, незавершённые
+части удаляются. Страницы архива и JSONL читаются по мере разбора: в памяти одновременно
+не больше --buffer-size МБ их содержимого (часть вывода разбирается несколькими пакетами).
+
+--shard i/n оставляет страницы, остаток от деления хэша имени которых на n равен i
+(0 <= i < n): разбиение не зависит от порядка обхода и машины, на которой выполняется запуск.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import tarfile
+import zlib
+from collections import namedtuple
+
+from .batch import parse_files, parse_many
+from .cache import ParseCache
+from .export import ExportSink, _plain
+from .FIPSDocParser import ENGINES, PARSERS, PartyDictionary
+
+# Страница источника: имя (путь относительно каталога, имя в архиве или файл:строка),
+# вид документа или None, путь к файлу (для каталога) и содержимое (для архива и JSONL)
+Page = namedtuple('Page', ('source', 'doc_type', 'path', 'data'))
+
+EXTENSIONS = ('.html', '.htm')
+
+# Форматы вывода: jsonl -- строка на документ, остальные -- таблицы export.ExportSink
+OUTPUT_FORMATS = ('jsonl', 'parquet', 'arrow', 'csv')
+
+CHECKPOINT = '_checkpoint%s.jsonl'
+
+
+def iter_pages(source, doc_type=None):
+    """Страницы (Page) каталога, архива tar или файла JSONL source."""
+
+    if os.path.isdir(source):
+        for directory, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(EXTENSIONS):
+                    path = os.path.join(directory, filename)
+                    yield Page(os.path.relpath(path, source).replace(os.sep, '/'), doc_type, path, None)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, 'r:*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(EXTENSIONS):
+                    yield Page(member.name, doc_type, None, archive.extractfile(member).read())
+    else:
+        with open(source, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                yield Page(item.get('source') or "%s:%d" % (os.path.basename(source), number),
+                           item.get('doc_type') or doc_type, None, item['html'])
+
+
+def in_shard(source, shard, shards):
+    """Относится ли страница с именем source к части shard из shards."""
+
+    return zlib.crc32(source.encode('utf-8')) % shards == shard
+
+
+def parse_shard(value):
+    try:
+        shard, shards = map(int, value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("ожидается i/n, например 0/4")
+    if not 0 <= shard < shards:
+        raise argparse.ArgumentTypeError("номер части должен быть от 0 до n-1")
+    return shard, shards
+
+
+class Checkpoint:
+    """Записанные части вывода и имена разобранных в них страниц (файл в каталоге вывода)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parts = []
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, 'r+', encoding='utf-8', newline='') as f:
+                lines = f.readlines()
+                # неполная последняя строка (запуск прерван при записи) -- часть не была отмечена
+                if lines and not lines[-1].endswith('\n'):
+                    del lines[-1]
+                    f.seek(0)
+                    f.truncate(sum(len(line.encode('utf-8')) for line in lines))
+            for line in lines:
+                entry = json.loads(line)
+                self.parts.append(entry['part'])
+                self.done.update(entry['sources'])
+
+    def commit(self, part, sources):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'part': part, 'sources': sources}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.parts.append(part)
+        self.done.update(sources)
+
+
+def _parts(pages, size):
+    # части вывода -- итераторы по size страниц, без чтения страниц заранее
+    pages = iter(pages)
+    for first in pages:
+        yield itertools.chain((first,), itertools.islice(pages, size - 1))
+
+
+def _batches(pages, limit):
+    # пакеты страниц, содержимое которых (для страниц архива и JSONL) не больше limit байт;
+    # страницы каталога читаются в процессах пула и размер пакета не увеличивают
+    batch, size = [], 0
+    for page in pages:
+        if batch and page.data is not None and size + len(page.data) > limit:
+            yield batch
+            batch, size = [], 0
+        batch.append(page)
+        size += len(page.data) if page.data is not None else 0
+    if batch:
+        yield batch
+
+
+def _results(pages, args, cache, sources):
+    # имена разобранных страниц добавляются в sources
+    options = dict(processes=args.jobs, engine=args.engine, fields=args.fields, cache=cache,
+                   structured=args.structured, parties=PartyDictionary() if args.structured else None,
+                   budget=args.budget)
+    for batch in _batches(pages, args.buffer_size * (1 << 20)):
+        if batch[0].path is not None:
+            results = parse_files([page.path for page in batch], args.type, **options)
+        else:
+            results = parse_many([(page.doc_type, page.data) for page in batch], **options)
+        for result in results:
+            result.source = batch[result.index].source
+            yield result
+        sources.extend(page.source for page in batch)
+
+
+def _write_part(path, pages, args, cache, stats):
+    """Записывает часть вывода path; возвращает имена её страниц."""
+
+    sources = []
+    if args.format == 'jsonl':
+        with open(path, 'w', encoding='utf-8') as f:
+            for result in _results(pages, args, cache, sources):
+                stats.update(result)
+                f.write(json.dumps({'source': result.source, 'doc_type': result.doc_type, 'missing': result.missing,
+                                    'error': result.error, 'overrun': list(result.overrun),
+                                    'parsed': _plain(result.parsed)}, ensure_ascii=False) + '\n')
+    else:
+        with ExportSink(path, args.format, structured=args.structured) as sink:
+            for result in _results(pages, args, cache, sources):
+                stats.update(result)
+                sink.write(result)
+    return sources
+
+
+class _Stats:
+
+    def __init__(self):
+        self.documents = self.missing = self.errors = self.overrun = 0
+
+    def update(self, result):
+        self.documents += 1
+        self.missing += result.missing
+        self.errors += result.error is not None
+        self.overrun += bool(result.overrun)
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(prog='fips-parse', description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('source', help="каталог, архив tar или файл JSONL со страницами")
+    argparser.add_argument('-o', '--output', required=True, help="каталог вывода")
+    argparser.add_argument('-t', '--type', choices=sorted(PARSERS), help="вид документов (по умолчанию определяется)")
+    argparser.add_argument('-j', '--jobs', type=int, default=None,
+                           help="число процессов (по умолчанию -- по числу процессоров, 0 -- без пула)")
+    argparser.add_argument('-f', '--format', default='jsonl', choices=OUTPUT_FORMATS, help="формат вывода")
+    argparser.add_argument('--shard', type=parse_shard, default=None, help="часть корпуса i/n")
+    argparser.add_argument('--part-size', type=int, default=10000, help="число документов в части вывода")
+    argparser.add_argument('--buffer-size', type=float, default=256,
+                           help="наибольший объём страниц архива или JSONL в памяти, МБ")
+    argparser.add_argument('--resume', action='store_true', help="продолжить прерванный запуск")
+    argparser.add_argument('--engine', default=None, choices=ENGINES, help="движок извлечения (см. FIPSDocParser.parse)")
+    argparser.add_argument('--fields', type=lambda value: value.split(','), default=None,
+                           help="нужные поля через запятую")
+    argparser.add_argument('--structured', action='store_true',
+                           help="списки правообладателей и авторов -- записи Party")
+    argparser.add_argument('--budget', type=float, default=None, help="бюджет времени одного метода find_, с")
+    argparser.add_argument('--cache', default=None, help="база SQLite кэша результатов разбора")
+    args = argparser.parse_args(argv)
+
+    suffix = '-shard%dof%d' % args.shard if args.shard is not None else ''
+    os.makedirs(args.output, exist_ok=True)
+    checkpoint_path = os.path.join(args.output, CHECKPOINT % suffix)
+    if os.path.exists(checkpoint_path) and not args.resume:
+        argparser.error("в каталоге %s есть результаты прежнего запуска: укажите --resume" % args.output)
+    checkpoint = Checkpoint(checkpoint_path)
+
+    # незавершённые части прерванного запуска; части других запусков в том же каталоге
+    # (например, part-shard0of4-00001 для запуска без --shard с префиксом part-) не затрагиваются
+    prefix = 'part%s-' % suffix
+    own_part = re.compile(re.escape(prefix) + r"\d{5,}(?:\.jsonl)?\Z")
+    for name in os.listdir(args.output):
+        if own_part.match(name) and name not in checkpoint.parts:
+            _remove(os.path.join(args.output, name))
+
+    pages = (page for page in iter_pages(args.source, args.type)
+             if (args.shard is None or in_shard(page.source, *args.shard)) and page.source not in checkpoint.done)
+    cache = ParseCache(path=args.cache) if args.cache else None
+    stats = _Stats()
+    skipped = len(checkpoint.done)
+    number = len(checkpoint.parts)
+    for part in _parts(pages, args.part_size):
+        number += 1
+        name = '%s%05d%s' % (prefix, number, '.jsonl' if args.format == 'jsonl' else '')
+        sources = _write_part(os.path.join(args.output, name), part, args, cache, stats)
+        checkpoint.commit(name, sources)
+        print("%s: %d документов" % (name, len(sources)), file=sys.stderr)
+
+    print("разобрано: %d, отсутствуют в реестре: %d, ошибки: %d, превышен бюджет: %d, пропущено (разобраны ранее): %d"
+          % (stats.documents, stats.missing, stats.errors, stats.overrun, skipped), file=sys.stderr)
+    return 0
@@ -0,0 +1,185 @@
+"""
+Сравнение двух версий документа Открытых реестров ФИПС.
+
+diff_parsed сравнивает результаты разбора (словари parsed или ленивые результаты FIPSDocResult)
+и возвращает DocumentDiff: изменённые поля, новые и исчезнувшие извещения, смену статуса,
+правообладателей и авторов. diff_page сравнивает сохранённый снимок документа (Snapshot)
+с новой загрузкой страницы и не разбирает её, если отпечаток страницы (или, по выбору,
+разделов статуса и извещений) не изменился.
+"""
+
+import hashlib
+import re
+from collections import namedtuple
+
+from .FIPSDocParser import PARSERS, FIPSDocResult, create_parser, izv_signature
+
+# Отпечатки страницы: всей страницы и её разделов (None, если раздела на странице нет)
+Fingerprint = namedtuple('Fingerprint', ('page', 'status', 'izv'))
+
+# Изменение значения поля
+FieldChange = namedtuple('FieldChange', ('field', 'old', 'new'))
+
+# Разделы страницы: {имя: (начало раздела, конец раздела или None -- до конца страницы)}.
+# Отпечатки разделов вычисляются по исходным байтам страницы, без декодирования и очистки.
+SECTIONS = {
+    'status': (re.compile(rb"<td id=\"StatusR\">"), re.compile(rb"</td>")),
+    'izv': (re.compile(rb"<p class=\"NameIzv\">", re.IGNORECASE), None),
+}
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def fingerprint(data):
+    """Отпечатки страницы data (str или bytes)."""
+
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    sections = {}
+    for name, (start, end) in SECTIONS.items():
+        match = start.search(data)
+        if match is None:
+            sections[name] = None
+            continue
+        stop = end.search(data, match.end()) if end is not None else None
+        with memoryview(data) as view:
+            sections[name] = _digest(view[match.start():stop.end() if stop is not None else len(data)])
+    return Fingerprint(_digest(data), **sections)
+
+
+class Snapshot:
+    """
+    Снимок документа: вид документа (ключ PARSERS), отпечатки страницы (Fingerprint),
+    результат разбора parsed и pattern_version парсера, которым он получен (None -- неизвестна).
+    Для хранения между запусками -- as_dict/from_dict (совместимо с JSON).
+    """
+
+    __slots__ = ('doc_type', 'fingerprint', 'parsed', 'pattern_version')
+
+    def __init__(self, doc_type, fingerprint, parsed, pattern_version=None):
+        self.doc_type = doc_type
+        self.fingerprint = fingerprint
+        self.parsed = parsed
+        self.pattern_version = pattern_version
+
+    def __repr__(self):
+        return "Snapshot(doc_type=%r, fingerprint=%r, pattern_version=%r)" % (
+            self.doc_type, self.fingerprint, self.pattern_version)
+
+    def as_dict(self):
+        return {'doc_type': self.doc_type, 'fingerprint': self.fingerprint._asdict(), 'parsed': self.parsed,
+                'pattern_version': self.pattern_version}
+
+    @classmethod
+    def from_dict(cls, value):
+        return cls(value['doc_type'], Fingerprint(**value['fingerprint']), value['parsed'],
+                   value.get('pattern_version'))
+
+
+def take_snapshot(data, doc_type=None, encoding=None, engine=None):
+    """
+    Разбирает страницу data (см. create_parser) и возвращает её снимок.
+    Для заглушки отсутствующего документа выбрасывается DocumentNotExistsInOpenRegistry.
+    """
+
+    parser = create_parser(data, doc_type, encoding)
+    parser.parse(engine)
+    return Snapshot(parser.doc_type, fingerprint(data), parser.parsed, parser.pattern_version)
+
+
+class DocumentDiff:
+    """
+    Различия двух версий документа.
+
+    changes -- {поле: FieldChange} для полей (кроме izv), значения которых различаются;
+    new_izv -- извещения новой версии, которых нет в прежней (в порядке parsed['izv']);
+    removed_izv -- извещения прежней версии, которых нет в новой;
+    fast -- True, если страница не разбиралась, так как её отпечаток не изменился
+    (тогда различий нет).
+    """
+
+    __slots__ = ('changes', 'new_izv', 'removed_izv', 'fast')
+
+    def __init__(self, changes=None, new_izv=(), removed_izv=(), fast=False):
+        self.changes = changes if changes is not None else {}
+        self.new_izv = list(new_izv)
+        self.removed_izv = list(removed_izv)
+        self.fast = fast
+
+    def __bool__(self):
+        return bool(self.changes or self.new_izv or self.removed_izv)
+
+    def __repr__(self):
+        return "DocumentDiff(changes=%r, new_izv=%d, removed_izv=%d, fast=%r)" % (
+            sorted(self.changes), len(self.new_izv), len(self.removed_izv), self.fast)
+
+    @property
+    def status(self):
+        """Смена статуса (FieldChange) или None."""
+        return self.changes.get('status')
+
+    @property
+    def holders(self):
+        """Смена правообладателей (FieldChange) или None."""
+        return self.changes.get('holders')
+
+    @property
+    def authors(self):
+        """Смена авторов (FieldChange) или None."""
+        return self.changes.get('authors')
+
+    @property
+    def holder_replacements(self):
+        """Новые извещения, в которых указан новый правообладатель (поле holder)."""
+        return [izv for izv in self.new_izv if izv.get('holder')]
+
+
+def _as_parsed(value):
+    return value.as_dict() if isinstance(value, FIPSDocResult) else value
+
+
+def diff_parsed(old, new):
+    """
+    Различия результатов разбора old и new одного документа (словари parsed или FIPSDocResult).
+    Извещения сопоставляются по подписи (izv_signature), поэтому порядок списков не важен.
+    """
+
+    old, new = _as_parsed(old), _as_parsed(new)
+    changes = {field: FieldChange(field, old.get(field), new.get(field))
+               for field in sorted(old.keys() | new.keys())
+               if field != 'izv' and old.get(field) != new.get(field)}
+    old_izv = old.get('izv') or []
+    new_izv = new.get('izv') or []
+    old_signatures = {izv_signature(izv) for izv in old_izv}
+    new_signatures = {izv_signature(izv) for izv in new_izv}
+    return DocumentDiff(changes,
+                        [izv for izv in new_izv if izv_signature(izv) not in old_signatures],
+                        [izv for izv in old_izv if izv_signature(izv) not in new_signatures])
+
+
+def diff_page(previous, data, doc_type=None, encoding=None, engine=None, sections=False):
+    """
+    Сравнивает снимок previous с новой загрузкой страницы data.
+    Возвращает пару (DocumentDiff, снимок новой версии).
+
+    Если отпечаток страницы не изменился, страница не разбирается. При sections=True
+    страница не разбирается и тогда, когда не изменились разделы статуса и извещений
+    (изменения в других разделах страницы при этом не отслеживаются).
+    Снимок, полученный другой версией шаблонов парсера (pattern_version) или другим
+    видом документа, не используется: страница разбирается заново.
+    doc_type по умолчанию -- вид документа снимка.
+    """
+
+    doc_type = doc_type or previous.doc_type
+    current = fingerprint(data)
+    reusable = (doc_type == previous.doc_type and doc_type in PARSERS
+                and previous.pattern_version == PARSERS[doc_type].pattern_version)
+    same = current.page == previous.fingerprint.page
+    if not same and sections:
+        same = (current.status, current.izv) == (previous.fingerprint.status, previous.fingerprint.izv)
+    if reusable and same:
+        return DocumentDiff(fast=True), Snapshot(previous.doc_type, current, previous.parsed, previous.pattern_version)
+    snapshot = take_snapshot(data, doc_type, encoding, engine)
+    return diff_parsed(previous.parsed, snapshot.parsed), snapshot
@@ -0,0 +1,208 @@
+"""
+Выгрузка результатов пакетного разбора в колоночные форматы.
+
+Документы каждого вида записываются в свою таблицу с постоянным набором столбцов
+(поля парсера, см. table_schema), извещения (поле izv) -- в дочернюю таблицу izv,
+связанную с документом столбцами doc_type и index. Таблицы пишутся группами строк
+по row_group_size: в памяти одновременно находится не больше одной группы на таблицу.
+
+Форматы: 'parquet' и 'arrow' (файл Arrow IPC) -- при установленном pyarrow,
+'csv' и 'jsonl' -- без дополнительных зависимостей.
+"""
+
+import csv
+import json
+import os
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from .FIPSDocParser import LIST_FIELDS as PARSED_LIST_FIELDS
+from .FIPSDocParser import PARSERS, PARTY_FIELDS, Party
+
+FORMATS = ('parquet', 'arrow', 'csv', 'jsonl')
+
+# Поля документов, содержащие списки строк (а не строку); извещения izv -- в дочерней таблице
+LIST_FIELDS = tuple(field for field in PARSED_LIST_FIELDS if field != 'izv')
+
+# Столбцы дочерней таблицы извещений
+IZV_COLUMNS = ('doc_type', 'index', 'position', 'code', 'name', 'full_name', 'pub_date', 'text', 'holder', 'authors')
+
+# Столбцы извещений со сведениями о правообладателях и авторах
+IZV_PARTY_COLUMNS = ('holder', 'authors')
+
+
+def table_schema(doc_type):
+    """Столбцы таблицы документов вида doc_type: номер документа в партии, путь к файлу и поля парсера."""
+
+    return ('index', 'source') + tuple(field for field in PARSERS[doc_type].result_class.fields if field != 'izv')
+
+
+def _column_type(name, structured):
+    party = pyarrow.struct([(field, pyarrow.string()) for field in Party._fields])
+    if name == 'index' or name == 'position':
+        return pyarrow.int64()
+    if structured and (name in PARTY_FIELDS or name in IZV_PARTY_COLUMNS):
+        return pyarrow.list_(party)
+    if name in LIST_FIELDS:
+        return pyarrow.list_(pyarrow.string())
+    return pyarrow.string()
+
+
+def _plain(value):
+    # записи Party -- в виде словарей (для JSON и pyarrow), в том числе внутри списков и словарей
+    if isinstance(value, Party):
+        return value._asdict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    return json.dumps(_plain(value), ensure_ascii=False)
+
+
+class _Table:
+    """Буфер одной таблицы: значения накапливаются по столбцам и сбрасываются группами строк."""
+
+    def __init__(self, sink, name, columns):
+        self.sink = sink
+        self.name = name
+        self.columns = columns
+        self.buffers = {column: [] for column in columns}
+        self.rows = 0
+        self.file = None
+        self.writer = None
+
+    def append(self, row):
+        for column, buffer in self.buffers.items():
+            buffer.append(row.get(column))
+        self.rows += 1
+        if self.rows >= self.sink.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        path = os.path.join(self.sink.directory, "%s.%s" % (self.name, self.sink.format))
+        if self.sink.format in ('parquet', 'arrow'):
+            schema = pyarrow.schema([(column, _column_type(column, self.sink.structured)) for column in self.columns])
+            table = pyarrow.Table.from_pydict({column: [_plain(value) for value in buffer]
+                                               for column, buffer in self.buffers.items()}, schema=schema)
+            if self.writer is None:
+                if self.sink.format == 'parquet':
+                    self.writer = pyarrow.parquet.ParquetWriter(path, schema, compression=self.sink.compression)
+                else:
+                    self.writer = pyarrow.ipc.new_file(path, schema)
+            self.writer.write_table(table)
+        else:
+            if self.file is None:
+                self.file = open(path, 'w', encoding='utf-8', newline='')
+                if self.sink.format == 'csv':
+                    self.writer = csv.writer(self.file)
+                    self.writer.writerow(self.columns)
+            rows = zip(*self.buffers.values())
+            if self.sink.format == 'csv':
+                self.writer.writerows([_text(value) for value in row] for row in rows)
+            else:
+                self.file.writelines(json.dumps(dict(zip(self.columns, map(_plain, row))), ensure_ascii=False) + "\n"
+                                     for row in rows)
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        if self.writer is not None and hasattr(self.writer, 'close'):
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+
+
+class ExportSink:
+    """
+    Запись результатов разбора (ParseResult из batch.parse_many/parse_files) в каталог directory:
+    по файлу на каждый вид документа (patent.parquet, evm.parquet, ...) и izv.<формат> для извещений.
+
+    format -- один из FORMATS (по умолчанию 'parquet', если установлен pyarrow, иначе 'csv');
+    row_group_size -- число строк в группе;
+    structured -- результаты получены с structured=True (списки записей Party);
+    compression -- сжатие Parquet.
+
+    Результаты без данных (документ отсутствует в реестре, ошибка разбора) не записываются,
+    их число -- атрибут skipped.
+    """
+
+    def __init__(self, directory, format=None, row_group_size=10000, structured=False, compression='zstd'):
+        if format is None:
+            format = 'parquet' if pyarrow is not None else 'csv'
+        if format not in FORMATS:
+            raise ValueError("Неизвестный формат выгрузки: %s" % format)
+        if format in ('parquet', 'arrow') and pyarrow is None:
+            raise ImportError("Для формата %s требуется пакет pyarrow" % format)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.row_group_size = row_group_size
+        self.structured = structured
+        self.compression = compression
+        self.written = 0
+        self.skipped = 0
+        self.__tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __table(self, name):
+        table = self.__tables.get(name)
+        if table is None:
+            columns = IZV_COLUMNS if name == 'izv' else table_schema(name)
+            table = self.__tables[name] = _Table(self, name, columns)
+        return table
+
+    def write_parsed(self, doc_type, parsed, index=None, source=None):
+        """Записывает словарь parsed документа вида doc_type."""
+
+        row = dict(parsed, index=index, source=source)
+        self.__table(doc_type).append(row)
+        notices = parsed.get('izv')
+        if notices:
+            table = self.__table('izv')
+            for position, izv in enumerate(notices):
+                table.append(dict(izv, doc_type=doc_type, index=index, position=position))
+        self.written += 1
+
+    def write(self, result):
+        """Записывает результат ParseResult."""
+
+        if result.parsed is None:
+            self.skipped += 1
+        else:
+            self.write_parsed(result.doc_type, result.parsed, result.index, result.source)
+
+    def write_all(self, results):
+        """Записывает все результаты последовательности results; возвращает self."""
+
+        for result in results:
+            self.write(result)
+        return self
+
+    def close(self):
+        """Дописывает неполные группы строк и закрывает файлы."""
+
+        for table in self.__tables.values():
+            table.close()
+        self.__tables = {}
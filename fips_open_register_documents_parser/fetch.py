@@ -0,0 +1,236 @@
+"""
+Асинхронная загрузка и разбор документов Открытых реестров ФИПС.
+
+fetch_documents принимает пары (реестр или вид документа, номер), строит ссылки на документы,
+загружает страницы с ограничением числа одновременных запросов и их частоты и выдаёт
+результаты разбора (batch.ParseResult) по мере готовности. Разбор выполняется в executor,
+не блокируя цикл событий. HTTP-клиент подключаемый: любой объект с сопрограммами
+get(url) -> (код ответа, тело в байтах) и close() (см. UrllibTransport, AiohttpTransport).
+"""
+
+import asyncio
+import concurrent.futures
+import http.client
+import queue
+import urllib.parse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .batch import ParseResult, parse_document
+from .FIPSDocParser import PARSERS, REGISTRIES
+
+# Адрес страницы документа в Открытых реестрах
+REGISTRY_URL = "https://new.fips.ru/registers-doc-view/fips_servlet?DB={registry}&DocNumber={number}&TypeFile=html"
+
+# Реестр, используемый для вида документа по умолчанию (полезные модели -- реестр 'RUPM')
+DEFAULT_REGISTRIES = {
+    'patent': 'RUPAT',
+    'design': 'RUDE',
+    'evm': 'EVM',
+    'db': 'DB',
+    'tims': 'TIMS',
+}
+
+# Коды ответа, после которых запрос повторяется
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Ошибки соединения, после которых запрос повторяется (остальные исключения HTTP-клиента
+# сразу выдаются как результат с ошибкой)
+RETRY_ERRORS = (OSError, asyncio.TimeoutError, http.client.HTTPException)
+if aiohttp is not None:
+    RETRY_ERRORS += (aiohttp.ClientError,)
+
+
+def registry_url(registry, number, url=REGISTRY_URL):
+    """
+    Ссылка на документ number реестра registry (параметр DB, например 'RUPAT', 'RUPM', 'EVM')
+    или вида документа (ключ PARSERS, см. DEFAULT_REGISTRIES).
+    """
+
+    registry = DEFAULT_REGISTRIES.get(registry, registry)
+    if registry not in REGISTRIES:
+        raise ValueError("Неизвестный реестр: %s" % registry)
+    return url.format(registry=registry, number=urllib.parse.quote(str(number)))
+
+
+class UrllibTransport:
+    """
+    HTTP-клиент стандартной библиотеки: запросы выполняются в отдельных потоках
+    по постоянным соединениям (keep-alive), соединения с каждым сервером хранятся в пуле.
+    """
+
+    def __init__(self, limit=8, timeout=60):
+        self.timeout = timeout
+        self.__executor = concurrent.futures.ThreadPoolExecutor(limit)
+        self.__pools = {}
+
+    def __connection(self, scheme, host):
+        pool = self.__pools.setdefault((scheme, host), queue.LifoQueue())
+        try:
+            return pool, pool.get_nowait()
+        except queue.Empty:
+            if scheme == 'https':
+                return pool, http.client.HTTPSConnection(host, timeout=self.timeout)
+            return pool, http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def __get(self, url):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + ("?" + parts.query if parts.query else "")
+        pool, connection = self.__connection(parts.scheme, parts.netloc)
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            body = response.read()
+        except Exception:
+            connection.close()
+            raise
+        pool.put(connection)
+        return response.status, body
+
+    async def get(self, url):
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, self.__get, url)
+
+    async def close(self):
+        self.__executor.shutdown()
+        for pool in self.__pools.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+
+
+class AiohttpTransport:
+    """HTTP-клиент на основе aiohttp (общая сессия с пулом не более limit соединений)."""
+
+    def __init__(self, limit=8, timeout=60):
+        self.limit = limit
+        self.timeout = timeout
+        self.__session = None
+
+    async def get(self, url):
+        if self.__session is None:
+            self.__session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.limit),
+                                                   timeout=aiohttp.ClientTimeout(total=self.timeout))
+        async with self.__session.get(url) as response:
+            return response.status, await response.read()
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+
+def default_transport(limit=8, timeout=60):
+    """AiohttpTransport, если установлен aiohttp, иначе UrllibTransport."""
+
+    if aiohttp is not None:
+        return AiohttpTransport(limit, timeout)
+    return UrllibTransport(limit, timeout)
+
+
+class RateLimiter:
+    """Ограничение частоты: не больше rate начатых запросов в секунду."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.__next = None
+        self.__lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.__lock:
+            now = asyncio.get_running_loop().time()
+            if self.__next is not None and self.__next > now:
+                await asyncio.sleep(self.__next - now)
+                now = self.__next
+            self.__next = now + self.interval
+
+
+async def _fetch_one(index, kind, number, transport, limiter, executor, options):
+    try:
+        url = registry_url(kind, number, options['url'])
+    except ValueError as e:
+        return ParseResult(index, None, None, error=str(e))
+    doc_type = REGISTRIES.get(kind, kind if kind in PARSERS else None)
+    for attempt in range(options['retries'] + 1):
+        if limiter is not None:
+            await limiter.wait()
+        try:
+            status, body = await transport.get(url)
+        except RETRY_ERRORS as e:
+            status, error = None, "%s: %s" % (type(e).__name__, e)
+        except Exception as e:
+            return ParseResult(index, url, doc_type, error="%s: %s" % (type(e).__name__, e))
+        else:
+            error = "HTTP %d" % status
+        if status is not None and status not in RETRY_STATUSES:
+            break
+        if attempt < options['retries']:
+            await asyncio.sleep(options['backoff'] * 2 ** attempt)
+    if status == 404:
+        return ParseResult(index, url, doc_type, missing=True)
+    if status != 200:
+        return ParseResult(index, url, doc_type, error=error)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, parse_document, index, doc_type, body, url, options['engine'], options['fields'], None,
+        options['structured'], options['budget'])
+
+
+async def fetch_documents(items, concurrency=8, rate=None, transport=None, executor=None, url=REGISTRY_URL,
+                          retries=2, backoff=1.0, engine=None, fields=None, structured=False, budget=None):
+    """
+    Загружает и разбирает документы. Асинхронный генератор объектов ParseResult
+    (в порядке готовности; index -- номер пары во входной последовательности, source -- ссылка).
+
+    items -- пары (реестр или вид документа, номер), например ('RUPAT', 2700000), ('evm', 2021612345);
+    concurrency -- наибольшее число одновременно загружаемых документов;
+    rate -- наибольшее число запросов в секунду (None -- без ограничения);
+    transport -- HTTP-клиент (по умолчанию default_transport; созданный здесь закрывается по окончании);
+    executor -- executor для разбора (None -- executor цикла событий по умолчанию;
+    для разбора на нескольких ядрах -- concurrent.futures.ProcessPoolExecutor);
+    url -- шаблон ссылки с полями {registry} и {number} (например, для тестового сервера);
+    retries, backoff -- число повторов запроса при ошибке соединения или ответе RETRY_STATUSES
+    и начальная пауза перед повтором в секундах (удваивается);
+    engine, fields, structured, budget -- см. FIPSDocParser.parse (метод, превысивший бюджет, прерывается
+    по таймеру только при разборе в ProcessPoolExecutor; в потоках превышение обнаруживается по его завершении).
+
+    Отсутствующие в реестре документы (страница-заглушка или ответ 404) выдаются
+    как результаты с missing=True, ошибки загрузки и разбора -- в поле error.
+    """
+
+    own_transport = transport is None
+    if own_transport:
+        transport = default_transport(concurrency)
+    limiter = RateLimiter(rate) if rate else None
+    options = {'url': url, 'retries': retries, 'backoff': backoff, 'engine': engine, 'fields': fields,
+               'structured': structured, 'budget': budget}
+    source = enumerate(items)
+    results = asyncio.Queue(concurrency)
+    done = object()
+
+    async def worker():
+        # входная последовательность общая: next() выполняется без переключения сопрограмм
+        try:
+            for index, (kind, number) in source:
+                await results.put(await _fetch_one(index, kind, number, transport, limiter, executor, options))
+        finally:
+            await results.put(done)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            result = await results.get()
+            if result is done:
+                running -= 1
+            else:
+                yield result
+        # исключения входной последовательности передаются вызывающему
+        for task in workers:
+            task.result()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if own_transport:
+            await transport.close()
@@ -0,0 +1,119 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from fips_open_register_documents_parser import cli
+from fips_open_register_documents_parser.cli import CHECKPOINT, Checkpoint, main
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'pages')
+
+
+class ShardResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.pages = os.path.join(self.directory, 'pages')
+        self.output = os.path.join(self.directory, 'out')
+        os.makedirs(self.pages)
+        self.sources = set()
+        for copy in range(3):
+            for filename in sorted(os.listdir(FIXTURES)):
+                if filename.startswith('missing-'):
+                    continue
+                name = '%d-%s' % (copy, filename)
+                shutil.copy(os.path.join(FIXTURES, filename), os.path.join(self.pages, name))
+                self.sources.add(name)
+
+    def run_cli(self, *args):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return main([self.pages, '-o', self.output, '-j', '0', '--part-size', '2'] + list(args))
+
+    def written(self, suffix=''):
+        """Имена страниц, записанных в части запуска, и проверка, что все отмеченные части на месте."""
+
+        checkpoint = Checkpoint(os.path.join(self.output, CHECKPOINT % suffix))
+        sources = []
+        for part in checkpoint.parts:
+            with open(os.path.join(self.output, part), encoding='utf-8') as f:
+                sources.extend(json.loads(line)['source'] for line in f)
+        return sources
+
+    def test_unsharded_run_keeps_shard_parts(self):
+        for shard in ('0/2', '1/2'):
+            self.run_cli('--shard', shard)
+        shard_parts = sorted(name for name in os.listdir(self.output) if name.startswith('part-shard'))
+        self.assertTrue(shard_parts)
+
+        self.run_cli()
+        self.run_cli('--resume')
+        self.assertEqual(shard_parts, sorted(name for name in os.listdir(self.output) if name.startswith('part-shard')))
+
+        self.run_cli('--shard', '0/2', '--resume')
+        sharded = self.written('-shard0of2') + self.written('-shard1of2')
+        self.assertEqual(sorted(sharded), sorted(self.sources))
+        self.assertEqual(sorted(self.written()), sorted(self.sources))
+
+    def test_resume_removes_only_unfinished_parts(self):
+        self.run_cli('--shard', '0/2')
+        self.run_cli()
+        # прерванный запуск: последняя часть записана, но не отмечена
+        path = os.path.join(self.output, CHECKPOINT % '-shard0of2')
+        with open(path, encoding='utf-8') as f:
+            lines = f.readlines()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:-1])
+        unfinished = json.loads(lines[-1])['part']
+        with open(os.path.join(self.output, unfinished), 'a', encoding='utf-8') as f:
+            f.write('{"source": "partial"')
+        unsharded = sorted(name for name in os.listdir(self.output) if name.startswith('part-0'))
+
+        self.run_cli('--shard', '0/2', '--resume')
+        self.assertEqual(unsharded, sorted(name for name in os.listdir(self.output) if name.startswith('part-0')))
+        shard0 = self.written('-shard0of2')
+        self.assertEqual(len(shard0), len(set(shard0)))
+        self.run_cli('--shard', '1/2')
+        self.assertEqual(sorted(shard0 + self.written('-shard1of2')), sorted(self.sources))
+
+
+class BufferTest(unittest.TestCase):
+
+    def test_jsonl_parts_are_parsed_in_bounded_batches(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        source = os.path.join(directory, 'pages.jsonl')
+        output = os.path.join(directory, 'out')
+        names = []
+        with open(source, 'w', encoding='utf-8') as f:
+            for filename in sorted(os.listdir(FIXTURES)) * 2:
+                with open(os.path.join(FIXTURES, filename), encoding='utf-8', errors='replace') as page:
+                    names.append('%d-%s' % (len(names), filename))
+                    f.write(json.dumps({'html': page.read(), 'source': names[-1]}) + '\n')
+        batches = []
+
+        def parse_many(items, **options):
+            items = list(items)
+            batches.append(len(items))
+            return cli_parse_many(items, **options)
+
+        cli_parse_many = cli.parse_many
+        with mock.patch.object(cli, 'parse_many', parse_many), contextlib.redirect_stderr(io.StringIO()):
+            main([source, '-o', output, '-j', '0', '--part-size', '4', '--buffer-size', '0.00001'])
+        self.assertEqual(set(batches), {1})
+        checkpoint = Checkpoint(os.path.join(output, CHECKPOINT % ''))
+        self.assertEqual(len(checkpoint.parts), (len(names) + 3) // 4)
+        written = []
+        for part in checkpoint.parts:
+            with open(os.path.join(output, part), encoding='utf-8') as f:
+                written.extend(json.loads(line)['source'] for line in f)
+        self.assertEqual(written, names)
+        self.assertEqual(checkpoint.done, set(names))
+
+
+if __name__ == '__main__':
+    unittest.main()
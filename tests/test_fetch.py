@@ -0,0 +1,62 @@
+import asyncio
+import os
+import unittest
+
+from fips_open_register_documents_parser.fetch import RETRY_ERRORS, fetch_documents
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'pages')
+
+
+class StubTransport:
+    """Отвечает страницей патента; запросы из errors завершаются исключением (один раз)."""
+
+    def __init__(self, errors):
+        with open(os.path.join(FIXTURES, 'patent-rupat.html'), 'rb') as f:
+            self.page = f.read()
+        self.errors = dict(errors)
+        self.requests = 0
+
+    async def get(self, url):
+        self.requests += 1
+        error = self.errors.pop(url.rsplit('DocNumber=', 1)[1].split('&')[0], None)
+        if error is not None:
+            raise error
+        return 200, self.page
+
+    async def close(self):
+        pass
+
+
+def fetch(transport, numbers):
+    async def collect():
+        return [result async for result in fetch_documents([('RUPAT', number) for number in numbers],
+                                                           concurrency=2, transport=transport, backoff=0)]
+    return sorted(asyncio.run(collect()), key=lambda result: result.index)
+
+
+class FetchErrorsTest(unittest.TestCase):
+
+    def test_connection_errors_are_retried(self):
+        errors = {'2': ConnectionResetError("reset")}
+        try:
+            import aiohttp
+        except ImportError:
+            pass
+        else:
+            errors['4'] = aiohttp.ServerDisconnectedError()
+            self.assertTrue(issubclass(aiohttp.ClientPayloadError, RETRY_ERRORS))
+        transport = StubTransport(errors)
+        results = fetch(transport, range(6))
+        self.assertEqual([result.index for result in results], list(range(6)))
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual(transport.requests, 6 + len(errors))
+
+    def test_other_errors_become_results(self):
+        results = fetch(StubTransport({'1': RuntimeError("broken")}), range(3))
+        self.assertEqual([result.index for result in results], [0, 1, 2])
+        self.assertEqual(results[1].error, "RuntimeError: broken")
+        self.assertIsNone(results[0].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
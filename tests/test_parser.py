@@ -0,0 +1,62 @@
+import os
+import unittest
+
+from fips_open_register_documents_parser.FIPSDocParser import create_parser, split_parties
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'pages')
+
+
+def fixture_parser(name='patent-rupat.html'):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return create_parser(f.read())
+
+
+class CheckEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = fixture_parser()
+        self.parser.parse()
+        self.expected = dict(self.parser.parsed)
+        self.parser = fixture_parser()
+
+    def test_result_as_dict(self):
+        self.assertEqual(self.parser.result('check').as_dict(), self.expected)
+
+    def test_repeated_parse_with_fields(self):
+        self.parser.parse()
+        self.parser.parse('check', fields=['status'])
+        self.parser.parse('check', fields=['status', 'title'])
+        self.assertEqual(self.parser.parsed, self.expected)
+
+    def test_fields_are_merged_into_parsed(self):
+        self.parser.parse('check', fields=['status'])
+        self.parser.parse('check', fields=['title'])
+        self.assertEqual(self.parser.parsed['status'], self.expected['status'])
+        self.assertEqual(self.parser.parsed['title'], self.expected['title'])
+
+
+class EngineNameTest(unittest.TestCase):
+
+    def test_unknown_engine(self):
+        parser = fixture_parser()
+        with self.assertRaises(ValueError):
+            parser.parse('anchor')
+
+
+class PartyKindTest(unittest.TestCase):
+
+    def kinds(self, value):
+        return [party.kind for party in split_parties(value)]
+
+    def test_surnames_are_persons(self):
+        self.assertEqual(self.kinds('Центров Иван (RU),<br>Компаниец П.И. (RU),<br>Фонда Д. (US)'),
+                         ['person', 'person', 'person'])
+
+    def test_organizations(self):
+        self.assertEqual(self.kinds('ООО "Ромашка" (RU),<br>Научно-исследовательский институт физики (RU),<br>'
+                                    'Техноцентр (RU),<br>Siemens Aktiengesellschaft (DE)'),
+                         ['organization'] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()